@@ -0,0 +1,30 @@
+"""
+    This file is part of python-webuntis
+
+    :copyright: (c) 2012 by Markus Unterwaditzer.
+    :license: BSD, see LICENSE for more details.
+
+Building the cache keys every session method call looks up, for the
+parameters of the different kinds of requests.
+"""
+import pytest
+
+from webuntis.utils.misc import cache_key
+
+arguments = {
+    'none': {},
+    'timetable': {'id': 1, 'type': 1, 'startDate': 20240304,
+                  'endDate': 20240308},
+    'timetable_extended': {'options': {
+        'element': {'id': 1, 'type': 1},
+        'startDate': 20240304, 'endDate': 20240308,
+        'onlyBaseTimetable': False, 'showBooking': True, 'showInfo': True,
+        'showSubstText': True, 'showLsText': True, 'showLsNumber': True,
+        'showStudentgroup': True,
+    }},
+}
+
+
+@pytest.mark.parametrize('kind', sorted(arguments))
+def test_cache_key(benchmark, kind):
+    benchmark(cache_key, 'timetable', arguments[kind])
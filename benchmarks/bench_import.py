@@ -0,0 +1,34 @@
+"""
+    This file is part of python-webuntis
+
+    :copyright: (c) 2012 by Markus Unterwaditzer.
+    :license: BSD, see LICENSE for more details.
+
+The time a new interpreter takes to import python-webuntis, which command
+line tools pay on every start. Compare with ``test_interpreter``, the
+startup of an interpreter that imports nothing.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(code):
+    subprocess.check_call([sys.executable, '-c', code], cwd=root)
+
+
+def test_interpreter(benchmark):
+    benchmark(run, 'pass')
+
+
+@pytest.mark.parametrize('module', [
+    'webuntis',
+    'webuntis.objects',
+    'webuntis.session',
+])
+def test_import(benchmark, module):
+    benchmark(run, 'import ' + module)
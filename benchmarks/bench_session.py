@@ -0,0 +1,39 @@
+"""
+    This file is part of python-webuntis
+
+    :copyright: (c) 2012 by Markus Unterwaditzer.
+    :license: BSD, see LICENSE for more details.
+
+Requests through a session, against the fake server.
+"""
+
+
+def test_login(benchmark, session):
+    benchmark(session.login)
+
+
+def test_master_data(benchmark, session):
+    def fetch():
+        session.klassen()
+        session.teachers()
+        session.rooms()
+        session.subjects()
+
+    benchmark(fetch)
+
+
+def test_timetable(benchmark, session, week):
+    benchmark(session.timetable, klasse=1, **week)
+
+
+def test_teacher_timetable(benchmark, session, week):
+    benchmark(session.timetable, teacher=1, **week)
+
+
+def test_timetable_from_cache(benchmark, session, week):
+    session.timetable(klasse=1, **week)
+    benchmark(session.timetable, klasse=1, from_cache=True, **week)
+
+
+def test_substitutions(benchmark, session, week):
+    benchmark(session.substitutions, **week)
@@ -0,0 +1,55 @@
+"""
+    This file is part of python-webuntis
+
+    :copyright: (c) 2012 by Markus Unterwaditzer.
+    :license: BSD, see LICENSE for more details.
+
+Working with a timetable that was already fetched: creating its items,
+rendering it and looking up related objects.
+"""
+import webuntis
+
+
+def fresh(timetable):
+    """A copy of the timetable without any already created items."""
+    return webuntis.objects.PeriodList(data=list(timetable.iter_raw()),
+                                       parent=timetable)
+
+
+def test_iterate(benchmark, timetable):
+    benchmark(lambda: [period.start for period in fresh(timetable)])
+
+
+def test_to_table(benchmark, timetable):
+    benchmark(lambda: fresh(timetable).to_table())
+
+
+def test_to_table_timegrid(benchmark, master_data, timetable):
+    master_data.timegrid_units(from_cache=True)
+    benchmark(lambda: fresh(timetable).to_table(timegrid=True))
+
+
+def test_combine(benchmark, timetable):
+    benchmark(lambda: fresh(timetable).combine())
+
+
+def test_filter(benchmark, master_data):
+    teachers = master_data.teachers(from_cache=True)
+    ids = set(range(1, len(teachers) + 1, 3))
+    benchmark(teachers.filter, id=ids)
+
+
+def test_relationships_lazy(benchmark, timetable):
+    def resolve():
+        for period in fresh(timetable):
+            period.teachers, period.rooms, period.subjects, period.klassen
+
+    benchmark(resolve)
+
+
+def test_relationships_resolve(benchmark, timetable):
+    def resolve():
+        for period in fresh(timetable).resolve():
+            period.teachers, period.rooms, period.subjects, period.klassen
+
+    benchmark(resolve)
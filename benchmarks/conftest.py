@@ -0,0 +1,74 @@
+"""
+    This file is part of python-webuntis
+
+    :copyright: (c) 2012 by Markus Unterwaditzer.
+    :license: BSD, see LICENSE for more details.
+"""
+import datetime
+
+import pytest
+
+import webuntis
+from webuntis.synthetic import SyntheticSchool
+from fakeserver import FakeServer
+
+#: classes and weeks of the synthetic schools
+sizes = {
+    'small': (5, 1),
+    'medium': (30, 4),
+    'large': (120, 12),
+}
+
+monday = datetime.date(2024, 3, 4)
+friday = monday + datetime.timedelta(days=4)
+
+
+def pytest_addoption(parser):
+    parser.addoption('--school-size', choices=sorted(sizes),
+                     default='medium',
+                     help='size of the synthetic school to benchmark with')
+
+
+@pytest.fixture(scope='session')
+def school(request):
+    classes, weeks = sizes[request.config.getoption('--school-size')]
+    return SyntheticSchool(classes=classes, weeks=weeks, start=monday)
+
+
+@pytest.fixture(scope='session')
+def server(school):
+    with FakeServer(school) as server:
+        yield server
+
+
+@pytest.fixture
+def session(server):
+    s = webuntis.Session(server=server.url, school='bench',
+                         username='bench', password='bench',
+                         useragent='python-webuntis benchmarks')
+    s.login()
+    yield s
+    s.logout(suppress_errors=True)
+
+
+@pytest.fixture
+def week():
+    """The ``start`` and ``end`` of the first school week, as keyword
+    arguments for the session methods."""
+    return {'start': monday, 'end': friday}
+
+
+@pytest.fixture
+def master_data(session):
+    """A session with all master data in its cache."""
+    session.klassen()
+    session.teachers()
+    session.rooms()
+    session.subjects()
+    return session
+
+
+@pytest.fixture
+def timetable(master_data):
+    """The timetable of one school class for a week."""
+    return master_data.timetable(klasse=1, start=monday, end=friday)
@@ -0,0 +1,82 @@
+"""
+    This file is part of python-webuntis
+
+    :copyright: (c) 2012 by Markus Unterwaditzer.
+    :license: BSD, see LICENSE for more details.
+
+A local, in-process JSON-RPC server that behaves like a WebUntis server for
+a :py:class:`webuntis.synthetic.SyntheticSchool`.
+"""
+import json
+import threading
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:  # Python 2
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class FakeServer(object):
+    """Serves a school on a random local port::
+
+        with FakeServer(SyntheticSchool()) as server:
+            s = webuntis.Session(server=server.url, ...)
+    """
+
+    def __init__(self, school):
+        self.school = school
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers['Content-Length'])
+                request = json.loads(self.rfile.read(length).decode('utf-8'))
+                try:
+                    body = {'result': fake.school.call(request['method'],
+                                                       request['params'])}
+                except KeyError:
+                    body = {'error': {'code': -32601,
+                                      'message': 'Method not found'}}
+                body['id'] = request['id']
+                body['jsonrpc'] = '2.0'
+                payload = json.dumps(body).encode('utf-8')
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = _ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return 'http://%s:%d/WebUntis/jsonrpc.do' % (host, port)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
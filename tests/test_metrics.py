@@ -0,0 +1,71 @@
+import webuntis
+import webuntis.metrics
+from . import WebUntisTestCase, stub_session_parameters, mock_results
+
+
+class MetricsTests(WebUntisTestCase):
+    def test_observers(self):
+        events = []
+        s = webuntis.Session(cachelen=1,
+                             observers=[lambda e, i: events.append((e, i))],
+                             **stub_session_parameters)
+
+        def getRooms(url, jsondata, headers):
+            return {'result': []}
+
+        def getSubjects(url, jsondata, headers):
+            return {'error': {'code': -8509, 'message': 'no right'}}
+
+        with mock_results({'getRooms': getRooms,
+                           'getSubjects': getSubjects}):
+            s.rooms(from_cache=True)
+            s.rooms(from_cache=True)
+            self.assertRaises(webuntis.errors.RemoteError, s.subjects)
+
+        assert [e for e, i in events] == [
+            'cache_miss', 'request_start', 'request_end',
+            'cache_hit',
+            'request_start', 'request_end',
+        ]
+        end = events[2][1]
+        assert end['method'] == 'getRooms'
+        assert end['latency'] >= 0
+        assert end['error'] is None
+        end = events[-1][1]
+        assert end['method'] == 'getSubjects'
+        assert end['error_code'] == -8509
+
+        s.cache[('foo', frozenset())] = 'bar'
+        assert events[-1] == ('cache_evict', {'method': 'rooms'})
+
+    def test_collector(self):
+        m = webuntis.metrics.MetricsCollector(buckets=[0.1, 1])
+        m('request_end', {'method': 'getRooms', 'latency': 0.05,
+                          'bytes': 100, 'decode_time': 0.01, 'error': None})
+        m('request_end', {'method': 'getRooms', 'latency': 2,
+                          'bytes': None, 'decode_time': None,
+                          'error': ValueError()})
+        m('cache_hit', {'method': 'rooms'})
+        m('cache_hit', {'method': 'rooms'})
+        m('cache_miss', {'method': 'rooms'})
+        m('cache_miss', {'method': 'klassen'})
+
+        stats = m.requests['getRooms']
+        assert stats.count == 2
+        assert stats.errors == 1
+        assert stats.bytes == 100
+        assert stats.histogram == [1, 0, 1]
+
+        assert m.hit_ratio('rooms') == 2.0 / 3
+        assert m.hit_ratio() == 0.5
+        assert m.hit_ratio('teachers') is None
+
+        text = m.to_prometheus()
+        assert 'webuntis_request_duration_seconds_bucket' \
+               '{method="getRooms",le="0.1"} 1' in text
+        assert 'webuntis_request_duration_seconds_bucket' \
+               '{method="getRooms",le="+Inf"} 2' in text
+        assert 'webuntis_request_duration_seconds_count' \
+               '{method="getRooms"} 2' in text
+        assert 'webuntis_cache_misses_total{method="klassen"} 1' in text
+        assert '# TYPE webuntis_request_errors_total counter' in text
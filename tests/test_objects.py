@@ -35,6 +35,20 @@ class ResultTests(WebUntisTestCase):
         assert r1 == r2
         assert hash(r1) == hash(r2)
 
+    def test_fingerprint(self):
+        r1 = self.Result(data={u'id': 124, u'name': u'a'}, session=object())
+        r2 = self.Result(data={u'name': u'a', u'id': 124}, session=object())
+        r3 = self.Result(data={u'id': 124, u'name': u'b'}, session=object())
+        assert r1.fingerprint == r2.fingerprint
+        assert r1.fingerprint != r3.fingerprint
+
+        l1 = webuntis.objects.KlassenList(
+            data=[{u'id': 1}, {u'id': 2}], session=object())
+        l2 = webuntis.objects.KlassenList(
+            data=[{u'id': 1}, {u'id': 2}], session=object())
+        l1[0]  # wrapping items doesn't change the fingerprint
+        assert l1.fingerprint == l2.fingerprint
+
     def test_str(self):
         r1 = self.Result(data={u'id': 124}, session=object())
         assert str(r1) == u"{u'id': 124}" or str(r1) == u"{'id': 124}"
@@ -83,6 +97,38 @@ class ListResultTests(WebUntisTestCase):
         assert 'CustomListResult' in s
         assert 'CustomItem' in s
 
+    def test_iter_without_caching(self):
+        class CustomItem(webuntis.objects.ListItem):
+            @self.lazyproperty
+            def value(self):
+                return self._data[u'val']
+
+        class CustomListResult(self.Result):
+            _itemclass = CustomItem
+
+        data = [{u'id': 1, u'val': 3}, {u'id': 2, u'val': 19}]
+
+        r = CustomListResult(data=list(data), session=object())
+        assert list(r.iter_raw()) == data
+        assert [x.value for x in r.iter_views()] == [3, 19]
+        assert [x.value for x in r.iter_views(reuse=True)] == [3, 19]
+        assert len(set(id(x) for x in r.iter_views(reuse=True))) == 1
+        assert r._data == data
+
+        first = r[0]
+        assert list(r.iter_raw()) == data
+        assert next(r.iter_views()) is first
+        # mixed content still compares equal
+        assert r == CustomListResult(data=list(data), session=object())
+
+        class UncachedListResult(CustomListResult):
+            _cache_items = False
+
+        r = UncachedListResult(data=list(data), session=object())
+        assert r[0].value == 3
+        assert r[0] is not r[0]
+        assert r._data == data
+
     def test_filter(self):
         class CustomItem(webuntis.objects.ListItem):
             @self.lazyproperty
@@ -620,6 +666,11 @@ class PeriodTestsData(WebUntisTestCase):
         c0 = combined._data[0]
         assert c0[u'startTime'] == 800
 
+        # lists with a parent, e.g. from filter(), can be combined too
+        combined = pl.filter(id={1111572, 1111573}).combine()
+        assert len(combined) == 1
+        assert combined._session is pl._session
+
         assert len(pl2) == 9
         combined = pl2.combine(combine_breaks=False)
         assert len(combined) == 6
@@ -639,6 +690,81 @@ class PeriodTestsData(WebUntisTestCase):
         assert c0[u'endTime'] == 1605
 
 
+class PeriodResolveTests(WebUntisTestCase):
+    def test_resolve(self):
+        calls = []
+
+        class CountingSession(StubSession):
+            def teachers(self, *args, **kw):
+                calls.append('teachers')
+                return StubSession.teachers(self, *args, **kw)
+
+        pl = webuntis.objects.PeriodList(
+            data=[
+                {u'id': 1, u'kl': [{u'id': 2}], u'te': [{u'id': 3}],
+                 u'su': [{u'id': 4}], u'ro': [{u'id': 5}, {u'id': 8}]},
+                {u'id': 2, u'kl': [{u'id': 2}], u'te': [{u'id': 7}, {u'id': 3}],
+                 u'su': [{u'id': 4}], u'ro': []},
+                {u'id': 3, u'kl': [{u'id': 2}], u'su': [{u'id': 4}],
+                 u'ro': [{u'id': 99}]},
+            ],
+            session=CountingSession())
+
+        assert pl.resolve(subjects=False) is pl
+        assert calls == ['teachers']
+
+        assert [t.name for t in pl[0].teachers] == [u'Hans Gans']
+        assert type(pl[0].teachers) is webuntis.objects.TeacherList
+        assert [t.id for t in pl[1].teachers] == [7, 3]
+        assert pl[2].teachers == []
+        assert [r.name for r in pl[0].rooms] == [u'PHY', u'TS']
+        assert len(pl[1].rooms) == 0
+        assert [k.name for k in pl[2].klassen] == [u'1A']
+        assert calls == ['teachers']
+
+        # not resolved: still evaluated lazily
+        assert 'subjects' not in pl[0].__dict__
+        assert pl[0].subjects[0].name == u'Math'
+        # unknown room ID
+        assert 'rooms' not in pl[2].__dict__
+        self.assertRaises(IndexError, lambda: pl[2].rooms)
+
+
+class PeriodDiffTests(WebUntisTestCase):
+    def test_diff(self):
+        old = webuntis.objects.PeriodList(
+            data=[
+                {'id': 1, 'date': 20180320, 'startTime': 800, 'endTime': 850,
+                 'te': [{'id': 35}], 'ro': [{'id': 150}]},
+                {'id': 2, 'date': 20180320, 'startTime': 850, 'endTime': 940,
+                 'te': [{'id': 35}], 'ro': [{'id': 150}]},
+                {'id': 3, 'date': 20180320, 'startTime': 955, 'endTime': 1045,
+                 'te': [{'id': 36}], 'ro': [{'id': 150}]},
+            ],
+            session=object())
+        new = webuntis.objects.PeriodList(
+            data=[
+                {'id': 1, 'date': 20180320, 'startTime': 800, 'endTime': 850,
+                 'te': [{'id': 35}], 'ro': [{'id': 150}]},
+                {'id': 2, 'date': 20180320, 'startTime': 850, 'endTime': 940,
+                 'te': [{'id': 37}], 'ro': [{'id': 150}], 'code': 'irregular'},
+                {'id': 4, 'date': 20180320, 'startTime': 1045, 'endTime': 1135,
+                 'te': [{'id': 36}], 'ro': [{'id': 150}]},
+            ],
+            session=object())
+
+        d = old.diff(new)
+        assert d
+        assert [p.id for p in d.added] == [4]
+        assert [p.id for p in d.removed] == [3]
+        assert len(d.changed) == 1
+        old_period, new_period, fields = d.changed[0]
+        assert old_period.id == new_period.id == 2
+        assert fields == {'te', 'code'}
+
+        assert not new.diff(new)
+
+
 class StudentTests(WebUntisTestCase):
 
     def test_students(self):
@@ -969,3 +1095,95 @@ class ClassRegCategoryTests(WebUntisTestCase):
         assert second.longname == "often late"
 
         assert type(second.group) == webuntis.objects.ClassRegCategoryGroup
+
+
+class PeriodQueryTests(WebUntisTestCase):
+    def test_queries(self):
+        tt = webuntis.objects.PeriodList(
+            data=[
+                {'id': 3, 'date': 20180320, 'startTime': 955,
+                 'endTime': 1045},
+                {'id': 1, 'date': 20180320, 'startTime': 800,
+                 'endTime': 940},
+                {'id': 2, 'date': 20180320, 'startTime': 850,
+                 'endTime': 940},
+                {'id': 4, 'date': 20180321, 'startTime': 800,
+                 'endTime': 850},
+            ],
+            session=object())
+
+        def at(day, hour, minute):
+            return datetime.datetime(2018, 3, day, hour, minute)
+
+        assert [p.id for p in tt.overlapping(at(20, 9, 0), at(20, 10, 0))] \
+            == [1, 2, 3]
+        assert [p.id for p in tt.covering(at(20, 8, 0))] == [1]
+        assert [p.id for p in tt.covering(at(20, 9, 40))] == []
+        assert [p.id for p in tt.within(at(20, 8, 0), at(21, 8, 0))] \
+            == [1, 2, 3]
+        assert tt.covering(at(20, 8, 0))[0] is tt[1]
+
+        rows = tt.to_table()
+        assert [t for t, row in rows] == [
+            datetime.time(8, 0), datetime.time(8, 50), datetime.time(9, 55)]
+        assert [sorted(p.id for p in cell) for d, cell in rows[1][1]] == \
+            [[1, 2], []]
+
+    def test_substitutions(self):
+        sl = webuntis.objects.SubstitutionList(
+            data=[
+                {'date': 20180319, 'startTime': 800, 'endTime': 850,
+                 'type': 'add'},
+                {'date': 20180319, 'startTime': 850, 'endTime': 940,
+                 'type': 'cancel'},
+            ],
+            session=object())
+        found = sl.covering(datetime.datetime(2018, 3, 19, 9, 0))
+        assert type(found) is webuntis.objects.SubstitutionList
+        assert [s.type for s in found] == ['cancel']
+
+
+class PeriodSlotTests(WebUntisTestCase):
+    def test_slots(self):
+        class TimegridSession(object):
+            def timegrid_units(self, from_cache=False):
+                units = [{'startTime': 800, 'endTime': 850},
+                         {'startTime': 850, 'endTime': 940},
+                         {'startTime': 955, 'endTime': 1045}]
+                return webuntis.objects.TimegridObject(
+                    data=[{'day': 2, 'timeUnits': units},
+                          {'day': 3, 'timeUnits': units[:2]}],
+                    session=self)
+
+        tt = webuntis.objects.PeriodList(
+            data=[
+                # a double lesson
+                {'id': 1, 'date': 20180319, 'startTime': 800,
+                 'endTime': 940},
+                {'id': 2, 'date': 20180319, 'startTime': 955,
+                 'endTime': 1045},
+                {'id': 3, 'date': 20180320, 'startTime': 850,
+                 'endTime': 940},
+            ],
+            session=TimegridSession())
+
+        monday = datetime.date(2018, 3, 19)
+        assert [p.id for p in tt.at(monday, 1)] == [1]
+        assert [p.id for p in tt.at(monday, 2)] == [1]
+        assert [p.id for p in tt.at(20180319, 3)] == [2]
+        assert [p.id for p in tt.at(20180320, 1)] == []
+        assert tt.at(monday, 1)[0] is tt.at(monday, 2)[0]
+
+        rows = tt.to_table(timegrid=True)
+        assert [t for t, row in rows] == [
+            datetime.time(8, 0), datetime.time(8, 50), datetime.time(9, 55)]
+        assert [[sorted(p.id for p in cell) for d, cell in row]
+                for t, row in rows] == [[[1], []], [[1], [3]], [[2], []]]
+
+        # the given timegrid is used, also for other iterables of periods
+        from webuntis.utils import timetable_utils
+        timegrid = [{'day': 2, 'timeUnits': [{'startTime': 800,
+                                              'endTime': 1045}]}]
+        rows = timetable_utils.table(iter(list(tt)), timegrid=timegrid)
+        assert [[sorted(p.id for p in cell) for d, cell in row]
+                for t, row in rows] == [[[1, 2], []]]
@@ -0,0 +1,116 @@
+import datetime
+import os
+import shutil
+import tempfile
+
+import webuntis
+from webuntis import periodstore
+from . import WebUntisTestCase
+
+
+class PeriodStoreTests(WebUntisTestCase):
+    data = [
+        {u'id': 1, u'date': 20120305, u'startTime': 800, u'endTime': 850,
+         u'kl': [{u'id': 1}], u'te': [{u'id': 3, u'orgid': 4}],
+         u'su': [], u'ro': [{u'id': 5}], u'code': u'irregular',
+         u'lstext': u'Ski trip \u26f7'},
+        {u'id': 2, u'date': 20120305, u'startTime': 850, u'endTime': 940,
+         u'kl': [{u'id': 1}, {u'id': 2}],
+         u'su': [{u'id': 7, u'name': u'M'}],
+         u'activityType': u'Unterricht', u'foo': {u'bar': [1, 2]}},
+        {u'id': 3, u'date': u'20120306', u'startTime': 800,
+         u'endTime': 850, u'kl': [{u'id': 2}]},
+    ]
+
+    def setUp(self):
+        WebUntisTestCase.setUp(self)
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'school.periods')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+        WebUntisTestCase.tearDown(self)
+
+    def test_roundtrip(self):
+        session = object()
+        periodstore.dump(
+            webuntis.objects.PeriodList(data=list(self.data),
+                                        session=object()),
+            self.path)
+        periods = periodstore.load(self.path, session=session)
+
+        assert len(periods) == 3
+        assert periods._session is session
+        assert [dict(row) for row in periods.iter_raw()] == self.data
+        assert periods[0]._data == self.data[0]
+        assert periods[-1]._data[u'date'] == u'20120306'
+        assert u'te' not in periods[1]._data
+        assert periods[1]._data.get(u'code') is None
+        self.assertRaises(KeyError, lambda: periods[1]._data[u'te'])
+        self.assertRaises(IndexError, lambda: periods[3])
+
+        # items are views that are not kept
+        assert periods[0] is not periods[0]
+        assert periods[0] == periods[0]
+        assert periods[0].start == datetime.datetime(2012, 3, 5, 8, 0)
+        assert periods[0].code == u'irregular'
+
+        point = datetime.datetime(2012, 3, 5, 9, 0)
+        assert [p.id for p in periods.covering(point)] == [2]
+        assert len(periods.to_table()) == 2
+
+    def test_list_operations(self):
+        import copy
+        import pickle
+        from webuntis.utils import serialization
+
+        data = self.data[:2]  # combine needs comparable dates
+        periodstore.dump(data, self.path)
+        periods = periodstore.load(self.path, session=object())
+        plain = webuntis.objects.PeriodList(data=list(data),
+                                            session=object())
+
+        assert periods.fingerprint == plain.fingerprint
+        assert list(periods.combine().iter_raw()) == \
+            list(plain.combine().iter_raw())
+        assert not periods.diff(plain)
+        assert not plain.diff(periods)
+        assert list(serialization.loads(serialization.dumps(periods),
+                                        object()).iter_raw()) == data
+
+        row = periods._data[0]
+        assert type(copy.deepcopy(row)) is dict
+        assert pickle.loads(pickle.dumps(row)) == data[0]
+
+    def test_derived_lists(self):
+        from webuntis.utils import serialization
+
+        data = self.data[:2]
+        periodstore.dump(data, self.path)
+        periods = periodstore.load(self.path, session=object())
+        point = datetime.datetime(2012, 3, 5, 8, 30)
+
+        filtered = periods.filter(id=1)
+        assert list(filtered.iter_raw()) == data[:1]
+        assert filtered.fingerprint == \
+            webuntis.objects.PeriodList(data=data[:1],
+                                        session=object()).fingerprint
+        assert list(serialization.loads(serialization.dumps(filtered),
+                                        object()).iter_raw()) == data[:1]
+
+        covering = periods.covering(point)
+        assert [p.id for p in covering.covering(point)] == [1]
+        assert [p.id for p in covering.overlapping(
+            point, datetime.datetime(2012, 3, 5, 10, 0))] == [1]
+
+        combined = periods.combine()
+        assert [p.id for p in combined.covering(point)] == [1]
+        assert list(combined.iter_raw()) == list(
+            webuntis.objects.PeriodList(data=list(data), session=object())
+            .combine().iter_raw())
+
+    def test_invalid(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'NOPE' + b'\0' * 32)
+        self.assertRaisesRegex(ValueError, 'Not a period file',
+                               periodstore.load, self.path, object())
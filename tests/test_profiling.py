@@ -0,0 +1,40 @@
+import webuntis
+import webuntis.profiling
+from webuntis.objects import ListResult
+from webuntis.utils.misc import lazyproperty
+from . import WebUntisTestCase
+
+
+class ProfilingTests(WebUntisTestCase):
+    def test_profile(self):
+        get_property = lazyproperty.__get__
+        get_item = ListResult.__getitem__
+
+        periods = webuntis.objects.PeriodList(data=[
+            {u'id': 1, u'date': 20240304,
+             u'startTime': 800, u'endTime': 850},
+            {u'id': 2, u'date': 20240304,
+             u'startTime': 900, u'endTime': 950},
+        ], session=object())
+
+        with webuntis.profiling.profile() as profiler:
+            assert lazyproperty.__get__ is not get_property
+            for period in periods:
+                period.start
+                period.start  # cached, not evaluated again
+            periods[0]
+
+        assert lazyproperty.__get__ is get_property
+        assert ListResult.__getitem__ is get_item
+
+        assert profiler.properties[('PeriodObject', 'start')][0] == 2
+        calls, created, total = profiler.items['PeriodList']
+        assert (calls, created) == (3, 2)
+
+        report = profiler.report()
+        assert 'PeriodObject.start' in report
+        assert 'PeriodList[]' in report
+        assert len(profiler.report(limit=1).splitlines()) == 2
+
+        periods[1].end  # not profiled anymore
+        assert ('PeriodObject', 'end') not in profiler.properties
@@ -0,0 +1,81 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+import webuntis
+from webuntis.recording import Recorder, Replayer
+from . import WebUntisTestCase, stub_session_parameters, mock_results
+
+
+class RecordingTests(WebUntisTestCase):
+    def setUp(self):
+        WebUntisTestCase.setUp(self)
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'traffic.jsonl.gz')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+        WebUntisTestCase.tearDown(self)
+
+    def test_record_and_replay(self):
+        rooms = [{'id': 1, 'name': 'R1'}, {'id': 2, 'name': 'R2'}]
+
+        def authenticate(url, jsondata, headers):
+            return {'id': jsondata['id'],
+                    'result': {'sessionId': 'Foobar_session_'}}
+
+        def getRooms(url, jsondata, headers):
+            return {'id': jsondata['id'], 'result': rooms}
+
+        with mock_results({'authenticate': authenticate,
+                           'getRooms': getRooms}):
+            with Recorder(self.path) as recorder:
+                s = webuntis.Session(transport=recorder,
+                                     **stub_session_parameters)
+                s.login()
+                assert [r.name for r in s.rooms()] == ['R1', 'R2']
+
+        f = gzip.open(self.path, 'rb')
+        try:
+            recording = f.read().decode('utf-8')
+        finally:
+            f.close()
+        assert len(recording.splitlines()) == 2
+        assert stub_session_parameters['password'] not in recording
+        assert stub_session_parameters['username'] not in recording
+        assert 'Foobar_session_' not in recording
+
+        # _send_request is not mocked anymore, nothing may hit the network
+        events = []
+        s = webuntis.Session(transport=Replayer(self.path),
+                             observers=[lambda e, i: events.append(i)],
+                             **stub_session_parameters)
+        s.login()
+        assert s.config['jsessionid'] == '<redacted>'
+        assert [r.name for r in s.rooms()] == ['R1', 'R2']
+        assert [r.name for r in s.rooms()] == ['R1', 'R2']
+        assert events[-1]['bytes'] > 0
+        assert events[-1]['status'] == 200
+
+        self.assertRaisesRegex(webuntis.errors.RemoteError,
+                               'No recorded response', s.subjects)
+
+    def test_replay_order(self):
+        results = [[{'id': 1, 'name': 'R1'}], [{'id': 2, 'name': 'R2'}]]
+
+        def getRooms(url, jsondata, headers):
+            return {'id': jsondata['id'], 'result': results.pop(0)}
+
+        with mock_results({'getRooms': getRooms}):
+            with Recorder(self.path) as recorder:
+                s = webuntis.Session(transport=recorder,
+                                     **stub_session_parameters)
+                s.rooms()
+                s.rooms()
+
+        s = webuntis.Session(transport=Replayer(self.path),
+                             **stub_session_parameters)
+        assert [r.name for r in s.rooms()] == ['R1']
+        assert [r.name for r in s.rooms()] == ['R2']
+        assert [r.name for r in s.rooms()] == ['R2']
@@ -1,3 +1,4 @@
+import datetime
 import mock
 
 import webuntis
@@ -197,6 +198,295 @@ class WrapperMethodTests(WebUntisTestCase):
                 assert not tt
                 assert type(tt.to_table()) is list
 
+    def test_chunked(self):
+        s = webuntis.Session(chunk_days=7, cachelen=50,
+                             **stub_session_parameters)
+
+        def getClassregEvents(url, jsondata, headers):
+            params = jsondata['params']
+            return {'result': [{'id': params['startDate'],
+                                'date': params['startDate']}]}
+
+        with mock_results({'getClassregEvents': getClassregEvents}):
+            # thursday to wednesday two weeks later
+            ev = s.class_reg_events(start=20120301, end=20120314)
+            assert type(ev) is webuntis.objects.ClassRegEventList
+            assert [e.id for e in ev] == [20120301, 20120305, 20120312]
+            assert len(getClassregEvents.calls) == 3
+
+            # sliding the window by a week only fetches the new week
+            ev = s.class_reg_events(start=20120305, end=20120321,
+                                    from_cache=True)
+            assert [e.id for e in ev] == [20120305, 20120312, 20120319]
+            assert len(getClassregEvents.calls) == 5
+            assert sorted(c[1]['params']['startDate']
+                          for c in getClassregEvents.calls[3:]) == \
+                [20120312, 20120319]
+
+    def test_chunked_login_repeat(self):
+        s = webuntis.Session(chunk_days=7, login_repeat=1,
+                             **stub_session_parameters)
+        expired = 'JSESSIONID=' + s.config['jsessionid']
+
+        def authenticate(url, jsondata, headers):
+            return {'result': {'sessionId': 'renewed'}}
+
+        def logout(url, jsondata, headers):
+            return {'result': None}
+
+        def getClassregEvents(url, jsondata, headers):
+            if headers['Cookie'] == expired:
+                return {'error': {'code': -8520, 'message': 'Not logged in!'}}
+            params = jsondata['params']
+            return {'result': [{'id': params['startDate'],
+                                'date': params['startDate']}]}
+
+        with mock_results({'authenticate': authenticate, 'logout': logout,
+                           'getClassregEvents': getClassregEvents}):
+            ev = s.class_reg_events(start=20120301, end=20120321)
+            assert [e.id for e in ev] == [20120301, 20120305, 20120312,
+                                          20120319]
+        # the chunks failed at the same time, but only logged in once
+        assert len(authenticate.calls) == 1
+
+        self.assertRaises(ValueError, webuntis.Session, chunk_days=0)
+        self.assertRaises(ValueError, webuntis.Session, chunk_days=-1)
+
+    def test_timetable_partial_cache_hit(self):
+        s = webuntis.Session(**stub_session_parameters)
+
+        def getTimetable(url, jsondata, headers):
+            params = jsondata['params']
+            days = range(params['startDate'], params['endDate'] + 1)
+            return {'result': [{'id': params['id'] * 100 + day % 100,
+                                'date': day} for day in days]}
+
+        with mock_results({'getTimetable': getTimetable}):
+            tt = s.timetable(start=20120305, end=20120311, klasse=1)
+            assert len(tt) == 7
+            assert len(getTimetable.calls) == 1
+
+            # sub-range: answered from the cache
+            tt = s.timetable(start=20120305, end=20120309, klasse=1,
+                             from_cache=True)
+            assert [p.id for p in tt] == [105, 106, 107, 108, 109]
+            assert len(getTimetable.calls) == 1
+
+            # overlapping range: only the missing days are fetched
+            tt = s.timetable(start=20120309, end=20120313, klasse=1,
+                             from_cache=True)
+            assert [p.id for p in tt] == [109, 110, 111, 112, 113]
+            assert len(getTimetable.calls) == 2
+            params = getTimetable.calls[-1][1]['params']
+            assert (params['startDate'], params['endDate']) == \
+                (20120312, 20120313)
+
+            # other elements are cached separately
+            tt = s.timetable(start=20120305, end=20120306, klasse=2,
+                             from_cache=True)
+            assert [p.id for p in tt] == [205, 206]
+            assert len(getTimetable.calls) == 3
+
+            s.cache.clear('timetable')
+            s.timetable(start=20120305, end=20120306, klasse=1,
+                        from_cache=True)
+            assert len(getTimetable.calls) == 4
+
+    def test_sync_timetable(self):
+        s = webuntis.Session(**stub_session_parameters)
+        results = [
+            [{'id': 1, 'date': 20120305, 'code': 'cancelled'},
+             {'id': 2, 'date': 20120305}],
+            [{'id': 1, 'date': 20120305, 'code': 'cancelled'},
+             {'id': 2, 'date': 20120305}],
+            [{'id': 1, 'date': 20120305},
+             {'id': 3, 'date': 20120306}],
+        ]
+
+        def getTimetable(url, jsondata, headers):
+            return {'result': results.pop(0)}
+
+        with mock_results({'getTimetable': getTimetable}):
+            d = s.sync_timetable(start=20120305, end=20120306, klasse=1)
+            assert sorted(p.id for p in d.added) == [1, 2]
+
+            d = s.sync_timetable(start=20120305, end=20120306, klasse=1)
+            assert not d
+
+            d = s.sync_timetable(start=20120305, end=20120306, klasse=1)
+            assert [p.id for p in d.added] == [3]
+            assert [p.id for p in d.removed] == [2]
+            assert [fields for o, n, fields in d.changed] == [{'code'}]
+
+    def test_sync_timetable_snapshots(self):
+        s = webuntis.Session(cachelen=2, **stub_session_parameters)
+
+        def getTimetable(url, jsondata, headers):
+            return {'result': [{'id': 1, 'date': 20120305}]}
+
+        with mock_results({'getTimetable': getTimetable}):
+            for klasse in (1, 2, 3):
+                assert s.sync_timetable(start=20120305, end=20120305,
+                                        klasse=klasse).added
+            assert len(s.timetable_snapshots) == 2
+            assert not s.sync_timetable(start=20120305, end=20120305,
+                                        klasse=3)
+
+            s.cache.clear()
+            assert len(s.timetable_snapshots) == 0
+            assert s.sync_timetable(start=20120305, end=20120305,
+                                    klasse=3).added
+
+    def test_free_rooms(self):
+        s = webuntis.Session(**stub_session_parameters)
+        timetables = {
+            1: [{'id': 1, 'date': 20120305, 'startTime': 800,
+                 'endTime': 850, 'ro': [{'id': 1}]}],
+            2: [{'id': 2, 'date': 20120305, 'startTime': 850,
+                 'endTime': 940, 'ro': [{'id': 2}], 'code': 'cancelled'},
+                {'id': 4, 'date': 20120305, 'startTime': 850,
+                 'endTime': 940, 'ro': [{'id': 3, 'orgid': 2}]}],
+            3: [{'id': 3, 'date': 20120305, 'startTime': 800,
+                 'endTime': 1000, 'ro': [{'id': 3}]}],
+        }
+
+        def getRooms(url, jsondata, headers):
+            return {'result': [{'id': i, 'name': 'R%d' % i}
+                               for i in (1, 2, 3)]}
+
+        def getTimetable(url, jsondata, headers):
+            return {'result': timetables[jsondata['params']['id']]}
+
+        slot = (datetime.datetime(2012, 3, 5, 8, 50),
+                datetime.datetime(2012, 3, 5, 9, 40))
+        with mock_results({'getRooms': getRooms,
+                           'getTimetable': getTimetable}):
+            assert [r.name for r in s.free_rooms(*slot)] == ['R1', 'R2']
+            assert len(getTimetable.calls) == 3
+
+            early = (datetime.datetime(2012, 3, 5, 7, 0),
+                     datetime.datetime(2012, 3, 5, 8, 0))
+            assert len(s.free_rooms(*early)) == 3
+            assert len(getTimetable.calls) == 3
+
+            timetables[1][0]['endTime'] = 900
+            assert [r.name for r in s.free_rooms(*slot, rooms=[1])] == ['R1']
+            assert [r.name for r in s.free_rooms(*slot, rooms=[1],
+                                                 refresh=True)] == []
+            assert len(getTimetable.calls) == 4
+
+    def test_free_rooms_keeps_cache(self):
+        s = webuntis.Session(cachelen=2, **stub_session_parameters)
+
+        def getRooms(url, jsondata, headers):
+            return {'result': [{'id': i, 'name': 'R%d' % i}
+                               for i in range(1, 6)]}
+
+        def getTimetable(url, jsondata, headers):
+            room = jsondata['params']['id']
+            return {'result': [{'id': room, 'date': 20120305,
+                                'startTime': 800, 'endTime': 850,
+                                'ro': [{'id': room}]}]}
+
+        slot = (datetime.datetime(2012, 3, 5, 8, 0),
+                datetime.datetime(2012, 3, 5, 8, 50))
+        with mock_results({'getRooms': getRooms,
+                           'getTimetable': getTimetable}):
+            tt = s.timetable(room=1, start=20120305, end=20120305)
+            assert len(s.free_rooms(*slot)) == 0
+            # room 1 came from the cache
+            assert len(getTimetable.calls) == 5
+            assert s.timetable(room=1, start=20120305, end=20120305,
+                               from_cache=True) is tt
+            assert len(s.cache.ranges) == 1
+
+    def test_intern_data(self):
+        s = webuntis.Session(intern_data=True, **stub_session_parameters)
+
+        def getTimetable(url, jsondata, headers):
+            klasse = jsondata['params']['id']
+            return {'result': [
+                {'id': klasse, 'date': 20120305, 'startTime': 800,
+                 'endTime': 850, 'kl': [{'id': klasse}],
+                 'te': [{'id': 1, 'name': u''.join(['Sm', 'ith'])}]},
+            ]}
+
+        with mock_results({'getTimetable': getTimetable}):
+            first = s.timetable(klasse=1, start=20120305, end=20120305)
+            second = s.timetable(klasse=2, start=20120305, end=20120305)
+
+        first, second = first[0]._data, second[0]._data
+        assert first['te'] == [{'id': 1, 'name': 'Smith'}]
+        assert first['te'][0] is second['te'][0]
+        assert first['kl'][0] is not second['kl'][0]
+        assert len(s.interner) > 0
+
+        s.cache.clear('timetable')
+        assert len(s.interner) == 0
+
+    def test_free_teachers(self):
+        s = webuntis.Session(**stub_session_parameters)
+
+        def getTeachers(url, jsondata, headers):
+            return {'result': [{'id': i, 'name': 'T%d' % i}
+                               for i in (1, 2, 3)]}
+
+        def getTimegridUnits(url, jsondata, headers):
+            return {'result': [{'day': 2, 'timeUnits': [
+                {'startTime': 800, 'endTime': 850},
+                {'startTime': 850, 'endTime': 940},
+            ]}]}
+
+        def getTimetable(url, jsondata, headers):
+            teacher = jsondata['params']['id']
+            return {'result': [
+                {'id': 1, 'date': 20120305, 'startTime': 800,
+                 'endTime': 850, 'te': [{'id': 1}]},
+                {'id': 2, 'date': 20120305, 'startTime': 850,
+                 'endTime': 940, 'te': [{'id': 3, 'orgid': 2}]},
+            ] if teacher != 3 else []}
+
+        with mock_results({'getTeachers': getTeachers,
+                           'getTimegridUnits': getTimegridUnits,
+                           'getTimetable': getTimetable}):
+            monday = datetime.date(2012, 3, 5)
+            assert [t.name for t in s.free_teachers(monday, 1)] == \
+                ['T2', 'T3']
+            assert [t.name for t in s.free_teachers(monday, 2)] == \
+                ['T1', 'T2', 'T3']
+            assert len(getTimetable.calls) == 3
+            assert s.teacher_availability.free_units(2, monday) == [1, 2]
+            self.assertRaises(ValueError, s.free_teachers, monday, 3)
+
+    def test_unchanged_result_reused(self):
+        s = webuntis.Session(**stub_session_parameters)
+        results = [
+            [{'id': 1, 'name': '1A'}],
+            [{'name': '1A', 'id': 1}],
+            [{'id': 1, 'name': '1B'}],
+            [{'id': 1, 'name': '1B'}],
+            [{'id': 1, 'name': '1B'}],
+        ]
+
+        def getKlassen(url, jsondata, headers):
+            return {'result': results.pop(0)}
+
+        with mock_results({'getKlassen': getKlassen}):
+            first = s.klassen()
+            assert first[0].name == '1A'
+            first.fingerprint  # only used fingerprints are compared
+            second = s.klassen()
+            assert second is first
+            third = s.klassen()
+            assert third is not first
+            assert third.fingerprint != first.fingerprint
+            assert s.klassen(from_cache=True) is third
+            # nobody used the fingerprint, so it isn't computed
+            s.cache.clear()
+            s.klassen()
+            fourth = s.klassen()
+            assert 'fingerprint' not in fourth.__dict__
+
     def test_timetable_start_later_than_end(self):
         s = webuntis.Session(**stub_session_parameters)
         start = 20120308
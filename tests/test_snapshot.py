@@ -0,0 +1,57 @@
+import json
+import os
+import shutil
+import tempfile
+
+import webuntis
+from webuntis.snapshot import SchoolSnapshot
+from webuntis.synthetic import SyntheticSchool
+from . import WebUntisTestCase, stub_session_parameters, mock_results
+
+
+class SnapshotTests(WebUntisTestCase):
+    def setUp(self):
+        WebUntisTestCase.setUp(self)
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+        WebUntisTestCase.tearDown(self)
+
+    def test_fetch_save_load(self):
+        school = SyntheticSchool(classes=3)
+
+        def answer(url, jsondata, headers):
+            # a copy, like a real response
+            result = school.call(jsondata['method'], jsondata['params'])
+            return {'result': json.loads(json.dumps(result))}
+
+        methods = ['getKlassen', 'getTeachers', 'getRooms', 'getSubjects',
+                   'getTimegridUnits', 'getStatusData', 'getTimetable']
+        s = webuntis.Session(**stub_session_parameters)
+        with mock_results(dict((method, answer) for method in methods)):
+            snapshot = SchoolSnapshot.fetch(s, school.start, school.end)
+
+        assert sorted(snapshot.timetables) == [1, 2, 3]
+        assert len(snapshot.periods) == len(school.all_periods())
+
+        period = snapshot.timetable(klasse=1)[0]
+        assert period.klassen[0].id == 1
+        # the master data is shared
+        other = snapshot.timetable(klasse=2)[0]
+        assert period.teachers._parent is other.teachers._parent \
+            is snapshot.teachers()
+
+        path = os.path.join(self.tmpdir, 'school.json.gz')
+        snapshot.save(path)
+        loaded = SchoolSnapshot.load(path)
+        assert loaded.start == snapshot.start
+        assert sorted(loaded.timetables) == [1, 2, 3]
+        assert list(loaded.periods.iter_raw()) == \
+            list(snapshot.periods.iter_raw())
+        assert loaded.timegrid_units()[0].day == 2
+
+        loaded.resolve()
+        period = loaded.timetable(klasse=3)[0]
+        assert 'teachers' in period.__dict__
+        assert period.teachers[0] in loaded.teachers()
@@ -0,0 +1,65 @@
+import datetime
+
+import webuntis
+from webuntis.synthetic import SyntheticSchool
+from . import WebUntisTestCase
+
+
+class SyntheticSchoolTests(WebUntisTestCase):
+    def test_consistency(self):
+        school = SyntheticSchool(classes=8, weeks=2, substitution_rate=0.2,
+                                 cancellation_rate=0.1,
+                                 start=datetime.date(2024, 3, 6))
+        assert school.start == datetime.date(2024, 3, 4)
+        assert school.end == datetime.date(2024, 3, 17)
+
+        periods = school.all_periods()
+        assert len(set(p['id'] for p in periods)) == len(periods)
+        parse_date = webuntis.utils.datetime_utils.parse_date
+        assert all(parse_date(p['date']).weekday() <= 4 for p in periods)
+
+        # nobody is in two places at the same time
+        for field in ('te', 'ro', 'kl'):
+            slots = set()
+            for p in periods:
+                slot = (p['date'], p['startTime'], p[field][0]['id'])
+                assert slot not in slots
+                slots.add(slot)
+
+        codes = [p.get('code') for p in periods]
+        assert 'cancelled' in codes and 'irregular' in codes
+        subst = school.substitutions(20240304, 20240308)
+        assert len(subst) == len([p for p in periods
+                                  if p['date'] <= 20240308 and 'code' in p])
+        assert set(s['type'] for s in subst) == {'cancel', 'subst'}
+
+        assert SyntheticSchool(seed=3).all_periods() == \
+            SyntheticSchool(seed=3).all_periods()
+
+    def test_objects(self):
+        school = SyntheticSchool(classes=3)
+        session = object()
+
+        klassen = webuntis.objects.KlassenList(
+            data=school.call('getKlassen', {}), session=session)
+        assert len(klassen) == 3
+        # creating the items doesn't change the school's data
+        assert isinstance(klassen[0], webuntis.objects.KlassenObject)
+        assert school.call('getKlassen', {})[0] == klassen[0]._data
+
+        tt = webuntis.objects.PeriodList(
+            data=school.call('getTimetable', {
+                'type': 1, 'id': klassen[0].id,
+                'startDate': 20240304, 'endDate': 20240304}),
+            session=session)
+        assert tt
+        assert all(p.start.date() == datetime.date(2024, 3, 4) for p in tt)
+        assert all(raw['kl'] == [{'id': klassen[0].id}]
+                   for raw in tt.iter_raw())
+
+        teacher_tt = school.timetable(2, tt[0]._data['te'][0]['id'])
+        assert tt[0]._data in teacher_tt
+
+        students = webuntis.objects.StudentsList(
+            data=school.students(), session=session)
+        assert len(students) == 75
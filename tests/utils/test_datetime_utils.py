@@ -29,3 +29,18 @@ class BasicUsage(WebUntisTestCase):
         assert x(800) == x('0800') == 800
         d = datetime.datetime.strptime('0800', '%H%M')
         assert x(d) == 800
+
+    def test_split_date_range(self):
+        x = dtutils.split_date_range
+        # 2012-03-01 is a thursday
+        assert x(20120301, 20120314, 7) == [
+            (20120301, 20120304),
+            (20120305, 20120311),
+            (20120312, 20120314)
+        ]
+        assert x(20120305, 20120305, 7) == [(20120305, 20120305)]
+        assert x(20120301, 20120303, 1) == [
+            (20120301, 20120301),
+            (20120302, 20120302),
+            (20120303, 20120303)
+        ]
@@ -0,0 +1,35 @@
+from webuntis.utils.interning import Interner
+from .. import WebUntisTestCase
+
+
+class InternerTests(WebUntisTestCase):
+    def test_call(self):
+        interner = Interner()
+        name = u''.join([u'Sm', u'ith'])
+        periods = [
+            {u'id': 1, u'te': [{u'id': 1, u'name': name}],
+             u'lstext': name, u'su': [{u'id': 2, u'list': [1]}]},
+            {u'id': 2, u'te': [{u'id': 1, u'name': u'Smith'}],
+             u'lstext': u''.join([u'Sm', u'ith'])},
+        ]
+        result = interner(periods)
+        assert result == periods
+        assert result[0] is not periods[0]
+        assert result[0][u'te'][0] is result[1][u'te'][0]
+        assert result[0][u'te'] is not result[1][u'te']
+        assert result[0][u'lstext'] is result[1][u'lstext']
+        # elements with unhashable values are not shared
+        assert interner(periods[0])[u'su'][0] is not result[0][u'su'][0]
+
+        interner.clear()
+        assert len(interner) == 0
+        assert interner(periods)[0][u'te'][0] is not result[0][u'te'][0]
+
+    def test_maxlen(self):
+        interner = Interner(maxlen=3)
+        interner([u'a', u'b', u'c'])
+        assert len(interner) == 3
+        interner([u'd'])
+        assert len(interner) == 4
+        interner([u'e'])  # too many before, forgets everything first
+        assert len(interner) == 1
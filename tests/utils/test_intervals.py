@@ -0,0 +1,89 @@
+from .. import WebUntisTestCase
+from webuntis.utils import intervals
+import datetime
+
+
+def period(date, start, end, **kwargs):
+    return dict(date=date, startTime=start, endTime=end, **kwargs)
+
+
+class OccupancyIndexTests(WebUntisTestCase):
+    def test_merge(self):
+        assert intervals.merge([(5, 6), (1, 3), (3, 4), (2, 3)]) == \
+            [[1, 4], [5, 6]]
+
+    def test_free(self):
+        index = intervals.OccupancyIndex()
+        index.update(1, [period(20120305, 800, 850),
+                         period(20120305, 850, 940),
+                         period(20120305, 1000, 1100, code='cancelled')],
+                     20120305, 20120306)
+        index.update(2, [], 20120305, 20120305)
+
+        def at(hour, minute):
+            return datetime.datetime(2012, 3, 5, hour, minute)
+
+        assert not index.is_free(1, at(9, 0), at(9, 10))
+        assert index.is_free(1, at(7, 0), at(8, 0))
+        assert index.is_free(1, at(9, 40), at(11, 0))
+        assert index.free(at(8, 0), at(8, 10), [1, 2]) == [2]
+
+        assert index.covers(1, 20120305, 20120306)
+        assert not index.covers(2, 20120305, 20120306)
+        assert not index.covers(3, 20120305, 20120305)
+
+        # only the given days are replaced
+        index.update(1, [], 20120305, 20120305)
+        assert index.is_free(1, at(9, 0), at(9, 10))
+
+    def test_update_from(self):
+        index = intervals.OccupancyIndex()
+        index.update_from([period(20120305, 800, 850, ro=[{'id': 1}]),
+                           period(20120305, 900, 950, ro=[{'id': 1},
+                                                          {'id': 2}])],
+                          'ro', 20120305, 20120305, resources=[1, 2, 3])
+        start = datetime.datetime(2012, 3, 5, 9, 0)
+        end = datetime.datetime(2012, 3, 5, 9, 10)
+        assert index.free(start, end, [1, 2, 3]) == [3]
+        assert index.covers(3, 20120305, 20120305)
+
+
+class TimegridIndexTests(WebUntisTestCase):
+    def test_units(self):
+        index = intervals.TimegridIndex([{'day': 2, 'timeUnits': [
+            {'startTime': 850, 'endTime': 940},
+            {'startTime': 800, 'endTime': 850},
+        ]}])
+        monday = datetime.date(2012, 3, 5)
+        assert intervals.untis_day(monday) == 2
+        assert intervals.untis_day(20120304) == 1
+        assert index.units(monday) == [(800, 850), (850, 940)]
+        assert index.units(20120304) == []
+
+        index.update(1, [period(20120305, 800, 850)], monday, monday)
+        index.update(2, [period(20120305, 800, 940)], monday, monday)
+        index.update(3, [], monday, monday)
+        assert index.free_in(monday, 1) == {3}
+        assert index.free_in(monday, 2) == {1, 3}
+        assert index.free_in(monday, 2, [1, 2, 4]) == {1}
+        assert index.occupied_in(monday, 1) == {1, 2}
+        assert index.free_units(1, monday) == [2]
+        assert index.free_units(4, monday) == []
+
+        # incremental update of one resource
+        index.update(2, [], monday, monday)
+        assert index.free_in(monday, 1) == {2, 3}
+
+
+class IntervalIndexTests(WebUntisTestCase):
+    def test_queries(self):
+        index = intervals.IntervalIndex([
+            (1, 10, 'a'), (2, 3, 'b'), (4, 6, 'c'), (7, 8, 'd'), (12, 14, 'e')
+        ])
+        assert len(index) == 5
+        assert index.overlapping(3, 5) == ['a', 'c']
+        assert index.overlapping(10, 12) == []
+        assert index.covering(2) == ['a', 'b']
+        assert index.covering(3) == ['a']
+        assert index.within(2, 8) == ['b', 'c', 'd']
+        assert intervals.IntervalIndex([]).overlapping(0, 100) == []
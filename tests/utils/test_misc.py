@@ -69,6 +69,16 @@ class Functions(WebUntisTestCase):
         assert hash(d) != hash(a)
         assert hash(d) != hash(c)
 
+        options = {'options': {'element': {'id': 1, 'type': 1},
+                               'startDate': 20120301, 'endDate': 20120307}}
+        e = x('timetable_extended', options)
+        f = x('timetable_extended', {'options': {
+            'endDate': 20120307, 'startDate': 20120301,
+            'element': {'type': 1, 'id': 1}}})
+        assert e == f and hash(e) == hash(f)
+        options['options']['element']['id'] = 2
+        assert x('timetable_extended', options) != e
+
 
 class LruDictTests(WebUntisTestCase):
     def test_basic_interface(self):
@@ -163,3 +173,28 @@ class FilterDictTests(WebUntisTestCase):
         assert list(d) == []
         d.update({'foo': 'bar', 'alwaysnone': True})
         assert set(d) == {'foo'}
+        assert d.get('foo') == 'whoopdeedoo'
+        assert d.get('alwaysnone', 4) == 4
+        assert d.get('what') is None
+
+
+class RangeCacheTests(WebUntisTestCase):
+    def test_missing_and_collect(self):
+        d = webuntis.utils.misc.RangeCache(maxlen=5)
+        key = ('timetable', frozenset())
+
+        assert d.missing(key, 20120301, 20120303) == [(20120301, 20120303)]
+
+        d.store(key, 20120302, 20120303, [
+            {'id': 1, 'date': 20120303},
+            {'id': 2, 'date': 20120302},
+        ])
+        assert d.missing(key, 20120301, 20120305) == [
+            (20120301, 20120301),
+            (20120304, 20120305)
+        ]
+        assert [p['id'] for p in d.collect(key, 20120302, 20120303)] == [2, 1]
+        assert d.collect(key, 20120303, 20120303) == [{'id': 1, 'date': 20120303}]
+
+        d.clear('timetable')
+        assert not d
@@ -0,0 +1,73 @@
+import webuntis
+from webuntis.utils.parallel import process_map
+from .. import WebUntisTestCase
+
+
+def count_cancelled(periods):
+    return sum(1 for period in periods if period.code == u'cancelled')
+
+
+class ProcessMapTests(WebUntisTestCase):
+    def timetables(self):
+        session = object()
+        return [
+            webuntis.objects.PeriodList(session=session, data=[
+                {u'id': k * 10 + 1, u'date': 20120305, u'startTime': 800,
+                 u'endTime': 850, u'su': [{u'id': 1}], u'kl': [{u'id': k}],
+                 u'ro': [{u'id': 1}], u'te': [{u'id': 1}]},
+                {u'id': k * 10 + 2, u'date': 20120305, u'startTime': 850,
+                 u'endTime': 940, u'su': [{u'id': 1}], u'kl': [{u'id': k}],
+                 u'ro': [{u'id': 2}], u'te': [{u'id': 1}],
+                 u'code': u'cancelled'},
+            ])
+            for k in range(5)
+        ]
+
+    def test_operations(self):
+        for workers in (1, 2):
+            timetables = self.timetables()
+            tables = process_map('to_table', timetables, workers=workers)
+            assert len(tables) == 5
+            time, row = tables[0][0]
+            date, cell = row[0]
+            assert cell == {timetables[0][0]}
+            assert list(cell)[0] is timetables[0][0]
+
+            combined = process_map('combine', timetables, workers=workers,
+                                   chunksize=2)
+            assert [list(c.iter_raw()) for c in combined] == \
+                [list(t.combine().iter_raw()) for t in timetables]
+            assert combined[3]._parent is timetables[3]
+
+            new = self.timetables()
+            new[1]._data.pop()
+            diffs = process_map('diff', list(zip(timetables, new)),
+                                workers=workers)
+            assert [bool(d) for d in diffs] == [False, True, False, False,
+                                                 False]
+            assert diffs[1].removed == [timetables[1][1]]
+
+            assert process_map(count_cancelled, timetables,
+                               workers=workers) == [1] * 5
+        assert process_map('to_table', []) == []
+
+    def test_mapped(self):
+        import os
+        import shutil
+        import tempfile
+        from webuntis import periodstore
+
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'school.periods')
+            timetable = self.timetables()[0]
+            periodstore.dump(timetable, path)
+            mapped = periodstore.load(path, session=object())
+            for workers in (1, 2):
+                tables = process_map('to_table', [mapped, mapped],
+                                     workers=workers)
+                assert tables[0] == timetable.to_table()
+                assert process_map(count_cancelled, [mapped],
+                                   workers=workers) == [1]
+        finally:
+            shutil.rmtree(tmpdir)
@@ -1,6 +1,8 @@
+import logging
 import webuntis
 import mock
 from webuntis.utils.third_party import json
+from webuntis.utils.remote import _send_request
 from .. import WebUntisTestCase, BytesIO
 
 
@@ -36,3 +38,54 @@ class BasicUsage(WebUntisTestCase):
             self.assertRaises(exc, x, a, {
                 'error': {'code': code, 'message': 'hello'}
             })
+
+    def test_send_request_logging(self):
+        str_calls = []
+
+        class Text(str):
+            def __str__(self):
+                str_calls.append(1)
+                return str.__str__(self)
+
+        class Response(object):
+            status_code = 200
+            text = Text('{"id": "1", "result": [1, 2, 3]}')
+            content = text.encode('utf-8')
+
+        class HttpSession(object):
+            def post(self, url, data, headers):
+                return Response()
+
+        x = _send_request  # the original, not the patched one
+        data = {'id': '1', 'method': 'getFoo', 'params': {}}
+
+        logger = logging.getLogger('webuntis')
+        level = logger.level
+        try:
+            logger.setLevel(logging.INFO)
+            assert x('url', data, {}, HttpSession())['result'] == [1, 2, 3]
+            assert not str_calls
+
+            logger.setLevel(logging.DEBUG)
+            with self.assertLogs('webuntis', 'DEBUG') as logs:
+                x('url', data, {}, HttpSession())
+        finally:
+            logger.setLevel(level)
+
+        record = logs.records[0]
+        assert record.rpc_method == 'getFoo'
+        assert record.rpc_status == 200
+        assert record.rpc_bytes == len(Response.content)
+        assert 'getFoo' in record.getMessage()
+        assert str_calls
+
+    def test_lazy_imports(self):
+        import subprocess
+        import sys
+        code = ('import sys, webuntis; '
+                'assert "requests" not in sys.modules; '
+                'assert "webuntis.session" not in sys.modules; '
+                'assert webuntis.Session is webuntis.session.Session; '
+                'assert webuntis.objects.PeriodList; '
+                'assert "requests" not in sys.modules')
+        subprocess.check_call([sys.executable, '-c', code])
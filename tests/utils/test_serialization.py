@@ -0,0 +1,64 @@
+import unittest
+import zlib
+
+import mock
+
+import webuntis
+from webuntis.utils import serialization
+from webuntis.utils.third_party import import_msgpack
+from .. import WebUntisTestCase
+
+
+class SerializationTests(WebUntisTestCase):
+    data = [
+        {u'id': 1, u'date': 20120305, u'startTime': 800, u'endTime': 850,
+         u'kl': [{u'id': 1, u'name': u'1A'}], u'te': [{u'id': 3}],
+         u'code': u'cancelled', u'lstext': u'Ski trip \u26f7'},
+        {u'id': 2, u'date': 20120306, u'startTime': 800, u'endTime': 850,
+         u'kl': [{u'id': 1, u'name': u'1A'}], u'te': [{u'id': 3}],
+         u'flags': [u'a', 1.5, None, True]},
+    ]
+
+    def check(self):
+        session = object()
+        periods = webuntis.objects.PeriodList(data=list(self.data),
+                                              session=object())
+        periods[0]  # items are saved as raw data
+        blob = serialization.dumps(periods)
+        assert len(blob) < len(repr(self.data))
+
+        loaded = serialization.loads(blob, session=session)
+        assert type(loaded) is webuntis.objects.PeriodList
+        assert loaded._session is session
+        assert list(loaded.iter_raw()) == self.data
+        assert loaded[1].start.day == 6
+
+        status = webuntis.objects.StatusData(
+            data={u'lstypes': [], u'codes': [{u'cancelled': {}}]},
+            session=session)
+        loaded = serialization.loads(serialization.dumps(status), session)
+        assert loaded._data == status._data
+
+        self.assertRaisesRegex(ValueError, 'Not a serialized',
+                               serialization.loads, b'X' + blob[1:], session)
+        for name in ('datetime', 'lazyproperty', 'NoSuchClass'):
+            forged = b'J' + zlib.compress(
+                ('[1, "%s", [], [], []]' % name).encode('utf-8'))
+            self.assertRaisesRegex(ValueError, 'Unknown result class',
+                                   serialization.loads, forged, session)
+        return blob
+
+    def test_impossible_date(self):
+        data = [{u'id': 1, u'date': 20120230, u'startDate': 20120229}]
+        holidays = webuntis.objects.HolidayList(data=list(data),
+                                                session=object())
+        loaded = serialization.loads(serialization.dumps(holidays), object())
+        assert list(loaded.iter_raw()) == data
+
+    def test_json(self):
+        with mock.patch('webuntis.utils.serialization.msgpack', None):
+            assert self.check()[:1] == b'J'
+
+    @unittest.skipUnless(import_msgpack(), 'msgpack is not installed')
+    def test_msgpack(self):
+        assert self.check()[:1] == b'M'
@@ -1,5 +1,6 @@
 import datetime
-from webuntis.utils.timetable_utils import table
+from webuntis.objects import PeriodList
+from webuntis.utils.timetable_utils import table, collisions
 from .. import WebUntisTestCase
 
 
@@ -36,3 +37,36 @@ class BasicUsage(WebUntisTestCase):
         assert all(len(row) == 3 for time, row in rows)
         assert all(all(len(cell) == 1 for date, cell in row) for time, row in rows)
         assert all(all(list(cell)[0] in given_input for date, cell in row) for time, row in rows)
+
+
+class CollisionTests(WebUntisTestCase):
+    def test_collisions(self):
+        def period(id, start, end, **kwargs):
+            return dict(id=id, date=20120305, startTime=start, endTime=end,
+                        **kwargs)
+
+        klasse1 = PeriodList(session=object(), data=[
+            period(1, 800, 850, ro=[{'id': 1}], kl=[{'id': 1}]),
+            period(2, 850, 940, ro=[{'id': 2}], kl=[{'id': 1}]),
+            period(3, 1000, 1050, ro=[{'id': 3}], kl=[{'id': 1}],
+                   code='cancelled'),
+        ])
+        klasse2 = PeriodList(session=object(), data=[
+            period(4, 830, 920, ro=[{'id': 1}], kl=[{'id': 2}]),
+            period(5, 900, 1000, ro=[{'id': 1}], kl=[{'id': 2}]),
+            period(6, 1000, 1050, ro=[{'id': 3}], kl=[{'id': 2}]),
+        ])
+        room1 = PeriodList(session=object(), data=[
+            period(1, 800, 850, ro=[{'id': 1}], kl=[{'id': 1}]),
+        ])
+
+        result = collisions([klasse1, klasse2, room1])
+        assert [(c.field, c.resource, [p.id for p in c.periods])
+                for c in result] == [
+            ('kl', 2, [4, 5]),
+            ('ro', 1, [1, 4, 5]),
+        ]
+        assert result[1].periods[0] is klasse1[0]
+
+        assert klasse1.collisions() == []
+        assert [c.resource for c in klasse2.collisions(fields=['ro'])] == [1]
@@ -0,0 +1,60 @@
+import contextlib
+
+import webuntis
+import webuntis.utils.tracing
+from .. import WebUntisTestCase, stub_session_parameters, mock_results
+
+
+class RecordingTracer(object):
+    def __init__(self):
+        self.spans = []
+
+    @contextlib.contextmanager
+    def start_as_current_span(self, name, attributes=None):
+        span = RecordingSpan(name, attributes)
+        self.spans.append(span)
+        yield span
+
+
+class RecordingSpan(object):
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = dict(attributes or {})
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+
+class BasicUsage(WebUntisTestCase):
+    def tearDown(self):
+        webuntis.utils.tracing.set_tracer(None)
+        WebUntisTestCase.tearDown(self)
+
+    def test_disabled(self):
+        with webuntis.utils.tracing.span('foo', bar=1) as span:
+            span.set_attribute('baz', 2)
+
+    def test_spans(self):
+        tracer = RecordingTracer()
+        webuntis.utils.tracing.set_tracer(tracer)
+        s = webuntis.Session(**stub_session_parameters)
+
+        def getTimetable(url, jsondata, headers):
+            return {'result': [
+                {'id': 1, 'date': 20120305, 'startTime': 800, 'endTime': 850,
+                 'su': [{'id': 1}], 'kl': [{'id': 1}]},
+                {'id': 2, 'date': 20120305, 'startTime': 850, 'endTime': 940,
+                 'su': [{'id': 1}], 'kl': [{'id': 1}]},
+            ]}
+
+        with mock_results({'getTimetable': getTimetable}):
+            tt = s.timetable(start=20120305, end=20120305, klasse=1)
+        tt.to_table()
+        tt.combine()
+
+        spans = dict((span.name, span.attributes) for span in tracer.spans)
+        assert spans['webuntis.request'] == {'method': 'getTimetable'}
+        assert spans['webuntis.construct'] == {'result_class': 'PeriodList',
+                                               'items': 2}
+        assert spans['webuntis.table'] == {'items': 2}
+        assert spans['webuntis.combine'] == {'items': 2}
@@ -5,6 +5,28 @@
     :license: BSD, see LICENSE for more details.
 """
 __version__ = '0.1.24'
-from webuntis.session import Session
+import sys
 
 from webuntis import errors
+
+# Session and the modules below are imported on first access, so importing
+# webuntis is fast for code that doesn't need all of them.
+_lazy_modules = ('session', 'objects', 'utils')
+
+
+def __getattr__(name):
+    import importlib
+    if name == 'Session':
+        value = importlib.import_module('webuntis.session').Session
+    elif name in _lazy_modules:
+        value = importlib.import_module('webuntis.' + name)
+    else:
+        raise AttributeError('module %r has no attribute %r'
+                             % (__name__, name))
+    globals()[name] = value
+    return value
+
+
+if sys.version_info < (3, 7):  # pragma: no cover
+    # no module __getattr__ (PEP 562)
+    from webuntis.session import Session
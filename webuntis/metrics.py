@@ -0,0 +1,167 @@
+"""
+    This file is part of python-webuntis
+
+    :copyright: (c) 2012 by Markus Unterwaditzer.
+    :license: BSD, see LICENSE for more details.
+
+Instrumentation for sessions. Every callable in
+:py:attr:`webuntis.Session.observers` gets called as ``observer(event,
+info)`` with one of the following events:
+
+- ``request_start`` -- before a JSON-RPC request is sent. ``info`` contains
+  the ``method``.
+- ``request_end`` -- after a JSON-RPC request finished, successfully or not.
+  ``info`` contains the ``method``, the ``latency`` in seconds, the size of
+  the response in ``bytes``, the ``decode_time`` of the JSON in seconds, the
+  HTTP ``status``, the exception as ``error`` and its API ``error_code``.
+  Values that are not available are ``None``.
+- ``cache_hit``, ``cache_miss`` -- a session method was called with
+  ``from_cache=True``. ``info`` contains the ``method``, which is the name of
+  the session method, e.g. ``timetable``.
+- ``cache_evict`` -- a result was dropped from the full cache. ``info``
+  contains the ``method``.
+
+Observers may be called from multiple threads at the same time when
+``chunk_days`` is used.
+"""
+import threading
+
+
+class MethodStats(object):
+    """Statistics about the requests of one JSON-RPC method."""
+
+    def __init__(self, buckets):
+        #: Number of requests.
+        self.count = 0
+        #: Number of failed requests.
+        self.errors = 0
+        #: Sum of the latencies, in seconds.
+        self.latency = 0.0
+        #: Sum of the response sizes, in bytes.
+        self.bytes = 0
+        #: Sum of the time spent decoding JSON, in seconds.
+        self.decode_time = 0.0
+        #: Number of requests per latency bucket, not cumulative.
+        self.histogram = [0] * (len(buckets) + 1)
+        self._buckets = buckets
+
+    def add(self, info):
+        self.count += 1
+        if info.get('error') is not None:
+            self.errors += 1
+        latency = info.get('latency') or 0.0
+        self.latency += latency
+        self.bytes += info.get('bytes') or 0
+        self.decode_time += info.get('decode_time') or 0.0
+
+        for i, bound in enumerate(self._buckets):
+            if latency <= bound:
+                self.histogram[i] += 1
+                break
+        else:
+            self.histogram[-1] += 1
+
+
+class MetricsCollector(object):
+    """An observer which aggregates the events of one or more sessions in
+    memory::
+
+        metrics = webuntis.metrics.MetricsCollector()
+        s = webuntis.Session(..., observers=[metrics])
+        ...
+        print(metrics.requests['getTimetable'].latency)
+        print(metrics.hit_ratio('timetable'))
+        print(metrics.to_prometheus())
+
+    :param buckets: Upper bounds of the latency histogram buckets, in
+        seconds.
+    """
+
+    #: Default upper bounds of the latency histogram buckets, in seconds.
+    buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets=None):
+        if buckets is not None:
+            self.buckets = tuple(sorted(buckets))
+        #: A dictionary of :py:class:`MethodStats` by JSON-RPC method.
+        self.requests = {}
+        #: A dictionary by session method, containing dictionaries with the
+        #: numbers of ``hit``, ``miss`` and ``evict`` events.
+        self.cache = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event, info):
+        method = info.get('method')
+        with self._lock:
+            if event == 'request_end':
+                if method not in self.requests:
+                    self.requests[method] = MethodStats(self.buckets)
+                self.requests[method].add(info)
+            elif event in ('cache_hit', 'cache_miss', 'cache_evict'):
+                if method not in self.cache:
+                    self.cache[method] = {'hit': 0, 'miss': 0, 'evict': 0}
+                self.cache[method][event[len('cache_'):]] += 1
+
+    def hit_ratio(self, method=None):
+        """The ratio of cache hits to cache lookups, either for one session
+        method or for all of them. ``None`` if there were no lookups."""
+        with self._lock:
+            counts = [c for m, c in self.cache.items()
+                      if method is None or m == method]
+            hits = sum(c['hit'] for c in counts)
+            lookups = hits + sum(c['miss'] for c in counts)
+        if not lookups:
+            return None
+        return float(hits) / lookups
+
+    def to_prometheus(self):
+        """Export the metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def metric(name, kind, description):
+            lines.append('# HELP %s %s' % (name, description))
+            lines.append('# TYPE %s %s' % (name, kind))
+
+        with self._lock:
+            requests = sorted(self.requests.items())
+            cache = sorted(self.cache.items())
+
+            metric('webuntis_request_duration_seconds', 'histogram',
+                   'Latency of JSON-RPC requests.')
+            for method, stats in requests:
+                cumulative = 0
+                bounds = [repr(float(b)) for b in self.buckets] + ['+Inf']
+                for bound, count in zip(bounds, stats.histogram):
+                    cumulative += count
+                    lines.append(
+                        'webuntis_request_duration_seconds_bucket'
+                        '{method="%s",le="%s"} %d'
+                        % (method, bound, cumulative))
+                lines.append('webuntis_request_duration_seconds_sum'
+                             '{method="%s"} %r' % (method, stats.latency))
+                lines.append('webuntis_request_duration_seconds_count'
+                             '{method="%s"} %d' % (method, stats.count))
+
+            for name, attr, description in (
+                    ('webuntis_request_errors_total', 'errors',
+                     'Failed JSON-RPC requests.'),
+                    ('webuntis_response_bytes_total', 'bytes',
+                     'Size of JSON-RPC responses.'),
+                    ('webuntis_decode_seconds_total', 'decode_time',
+                     'Time spent decoding JSON-RPC responses.')):
+                metric(name, 'counter', description)
+                for method, stats in requests:
+                    lines.append('%s{method="%s"} %r'
+                                 % (name, method, getattr(stats, attr)))
+
+            for kind, name, description in (
+                    ('hit', 'webuntis_cache_hits_total', 'Cache hits.'),
+                    ('miss', 'webuntis_cache_misses_total', 'Cache misses.'),
+                    ('evict', 'webuntis_cache_evictions_total',
+                     'Results evicted from the cache.')):
+                metric(name, 'counter', description)
+                for method, counts in cache:
+                    lines.append('%s{method="%s"} %d'
+                                 % (name, method, counts[kind]))
+
+        return '\n'.join(lines) + '\n'
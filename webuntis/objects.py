@@ -7,7 +7,7 @@
 import datetime
 
 from webuntis.utils import datetime_utils, lazyproperty, \
-    timetable_utils
+    timetable_utils, misc, intervals
 
 
 class Result(object):
@@ -46,6 +46,23 @@ class Result(object):
         original API response didn't contain any ID."""
         return self._data[u'id'] if 'id' in self._data else None
 
+    @lazyproperty
+    def fingerprint(self):
+        """A hash of the raw data of this result. Two results with the same
+        fingerprint have the same content, so checking whether anything
+        changed is cheap::
+
+            old = s.klassen()
+            new = s.klassen()
+            if new.fingerprint != old.fingerprint:
+                rerender()
+
+        It is computed once per result. Once it is used, the session
+        compares it with the fingerprint of data it fetches again for the
+        same request: if they are equal, the cached result object is
+        returned instead of creating a new one."""
+        return misc.fingerprint(self._data)
+
     def __int__(self):
         """This is useful if the users pass a ListItem when a numerical ID
         is expected, so we just can put the thing through int(), regardless of
@@ -104,6 +121,10 @@ class ListResult(Result):
     #: the class which should be used to instantiate an array item.
     _itemclass = ListItem
 
+    #: Whether item objects created when accessing an index replace the raw
+    #: data in :py:attr:`_data`. If false, every access creates a new item.
+    _cache_items = True
+
     def filter(self, **criterions):
         """
         Return a list of all objects, filtered by attributes::
@@ -180,13 +201,57 @@ class ListResult(Result):
         data = self._data[i]  # fails if there is no such item
 
         if type(data) is not self._itemclass:
-            data = self._data[i] = self._itemclass(
+            data = self._itemclass(
                 parent=self,
                 data=data
             )
+            if self._cache_items:
+                self._data[i] = data
 
         return data
 
+    def iter_raw(self):
+        """Iterate over the raw JSON data of the items, without creating any
+        item objects::
+
+            for period in s.timetable(...).iter_raw():
+                writer.writerow([period['date'], period['startTime']])
+        """
+        for data in self._data:
+            yield getattr(data, '_data', data)
+
+    def iter_views(self, reuse=False):
+        """Iterate over the items without saving them in the list. Unlike
+        normal iteration, this doesn't keep an item object for every item
+        alive, which is useful for one pass over very long lists.
+
+        :type reuse: bool
+        :param reuse: Use one single item object for all items, resetting it
+            for each of them. Much cheaper, but an item is only valid until
+            the iteration continues, so don't keep references to it.
+        """
+        view = None
+        for data in self._data:
+            if type(data) is self._itemclass:
+                yield data
+            elif not reuse:
+                yield self._itemclass(parent=self, data=data)
+            else:
+                if view is None:
+                    view = self._itemclass(parent=self, data=data)
+                else:
+                    # drop the values computed by lazyproperties
+                    view.__dict__.clear()
+                    view.__dict__.update(_session=self._session,
+                                         _parent=self,
+                                         _data=data)
+                yield view
+
+    @lazyproperty
+    def fingerprint(self):
+        """See :py:attr:`Result.fingerprint`."""
+        return misc.fingerprint(list(self.iter_raw()))
+
     def __len__(self):
         """Return the length of the items"""
         return len(self._data)
@@ -195,7 +260,8 @@ class ListResult(Result):
         raise NotImplementedError()
 
     def __eq__(self, other):
-        return type(other) is type(self) and other._data == self._data
+        return (type(other) is type(self) and
+                list(other.iter_raw()) == list(self.iter_raw()))
 
     def __str__(self):
         """a simple to string function: a list of results -- debug only"""
@@ -516,12 +582,94 @@ class PeriodObject(ListItem):
         return self._data.get(u'substText', u'')
 
 
-class PeriodList(ListResult):
+class PeriodQueryMixin:
+    """Queries by time for lists of periods and substitutions, which have
+    a ``date``, ``startTime`` and ``endTime``."""
+
+    @lazyproperty
+    def interval_index(self):
+        """An :py:class:`webuntis.utils.intervals.IntervalIndex` of the
+        positions of the items in this list, built from their raw dates and
+        times when it is first needed."""
+        return intervals.IntervalIndex(
+            (intervals.time_key(data[u'date'], data[u'startTime']),
+             intervals.time_key(data[u'date'], data[u'endTime']),
+             i)
+            for i, data in enumerate(self.iter_raw())
+        )
+
+    @lazyproperty
+    def slot_index(self):
+        """Which items take place in which unit of the school's timegrid,
+        see :py:func:`webuntis.utils.timetable_utils.slot_index`."""
+        return timetable_utils.slot_index(
+            self, self._session.timegrid_units(from_cache=True))
+
+    def at(self, date, unit):
+        """
+        The periods taking place in a unit of the school's timegrid::
+
+            third = tt.at(datetime.date(2024, 3, 4), 3)
+
+        Units are numbered from 1. The first call builds
+        :py:attr:`slot_index`, after that this is a dictionary lookup.
+
+        :type date: :py:class:`datetime.date` or int
+        :type unit: int
+        :returns: A list of the same type.
+        """
+        key = (datetime_utils.format_date(date), unit)
+        return self._indexed(self.slot_index.get(key, ()))
+
+    def _indexed(self, positions):
+        return type(self)(parent=self, data=[self[i] for i in positions])
+
+    def overlapping(self, start, end):
+        """
+        The periods that take place at least partially between ``start`` and
+        ``end``::
+
+            tt.overlapping(datetime.datetime(2024, 3, 4, 10, 0),
+                           datetime.datetime(2024, 3, 4, 11, 30))
+
+        This and the other queries use :py:attr:`interval_index` and take
+        logarithmic time, without parsing dates of periods.
+
+        :type start: :py:class:`datetime.datetime`
+        :type end: :py:class:`datetime.datetime`
+        :returns: A list of the same type, ordered by start.
+        """
+        return self._indexed(self.interval_index.overlapping(
+            intervals.datetime_key(start), intervals.datetime_key(end)))
+
+    def covering(self, point):
+        """
+        The periods that take place at ``point``.
+
+        :type point: :py:class:`datetime.datetime`
+        :returns: A list of the same type, ordered by start.
+        """
+        return self._indexed(self.interval_index.covering(
+            intervals.datetime_key(point)))
+
+    def within(self, start, end):
+        """
+        The periods that take place completely between ``start`` and ``end``.
+
+        :type start: :py:class:`datetime.datetime`
+        :type end: :py:class:`datetime.datetime`
+        :returns: A list of the same type, ordered by start.
+        """
+        return self._indexed(self.interval_index.within(
+            intervals.datetime_key(start), intervals.datetime_key(end)))
+
+
+class PeriodList(ListResult, PeriodQueryMixin):
     """Aka timetable, a list of periods, in form of :py:class:`PeriodObject`
     instances."""
     _itemclass = PeriodObject
 
-    def to_table(self, dates=None, times=None):
+    def to_table(self, dates=None, times=None, timegrid=False):
         """
         Creates a table-like structure out of the periods. Useful for rendering
         timetables in HTML and other markup languages.
@@ -538,12 +686,22 @@ class PeriodList(ListResult):
             ``None``, the timetable is just as tall as it has to be, leaving
             out hours without periods.
 
+        :type timegrid: bool
+        :param timegrid: Use the units of the school's timegrid as rows,
+            instead of the start times of the periods. Each unit shows the
+            periods overlapping with it, so double lessons show up in two
+            rows. ``times`` is ignored then.
+
         :returns: A list containing "rows", which in turn contain "hours",
             which contain :py:class:`webuntis.objects.PeriodObject` instances
             which are happening at the same time.
 
         """
 
+        if timegrid:
+            return timetable_utils.table(
+                self, dates=dates,
+                timegrid=self._session.timegrid_units(from_cache=True))
         return timetable_utils.table(self, dates=dates, times=times)
 
     def combine(self, combine_breaks=True):
@@ -554,6 +712,94 @@ class PeriodList(ListResult):
         """
         return timetable_utils.combine(self, {'date', 'activityType', 'su', 'kl'}, combine_breaks)
 
+    def resolve(self, teachers=True, rooms=True, subjects=True, klassen=True):
+        """
+        Look up the teachers, rooms, subjects and classes of all periods at
+        once::
+
+            tt = s.timetable(klasse=klasse, start=monday, end=friday)
+            tt.resolve()
+            for period in tt:
+                print(period.teachers, period.rooms)  # no lookups anymore
+
+        Accessing these properties on a single period fetches the whole list
+        of teachers (etc.) from the cache and filters it. This method instead
+        builds one dictionary per list and fills in the properties of every
+        period in a single pass. Periods that refer to unknown IDs are left
+        alone.
+
+        :returns: The period list itself.
+        """
+        relations = [
+            ('klassen', u'kl', klassen and self._session.klassen),
+            ('teachers', u'te', teachers and self._session.teachers),
+            ('subjects', u'su', subjects and self._session.subjects),
+            ('rooms', u'ro', rooms and self._session.rooms),
+        ]
+        periods = list(self)
+
+        for name, field, fetch in relations:
+            if not fetch:
+                continue
+            master = fetch(from_cache=True)
+            lookup = dict((item.id, item) for item in master)
+
+            for period in periods:
+                if name in period.__dict__:
+                    continue  # already evaluated
+                if field not in period._data:
+                    if name == 'teachers':
+                        period.__dict__[name] = []
+                    continue
+                try:
+                    items = [lookup[element[u'id']]
+                             for element in period._data[field]]
+                except KeyError:
+                    continue
+                period.__dict__[name] = type(master)(parent=master, data=items)
+
+        return self
+
+    def diff(self, other):
+        """
+        Compare this timetable with a newer version of it::
+
+            old = s.timetable(klasse=klasse, start=monday, end=friday)
+            # ... later ...
+            new = s.timetable(klasse=klasse, start=monday, end=friday)
+            changes = old.diff(new)
+            for old_period, new_period, fields in changes.changed:
+                if 'code' in fields:
+                    print(new_period.code)
+
+        Periods are matched by their ID and compared using a hash of their
+        data, so this is linear in the number of periods.
+
+        :param other: The newer :py:class:`PeriodList`.
+        :rtype: :py:class:`webuntis.utils.timetable_utils.TimetableDiff`
+        """
+        return timetable_utils.diff(self, other)
+
+    def collisions(self, fields=(u'ro', u'te', u'kl')):
+        """
+        Find rooms, teachers and classes that are booked twice at the same
+        time::
+
+            for collision in s.timetable(room=room, ...).collisions():
+                print(collision.resource, collision.periods)
+
+        To check a whole school, use
+        :py:func:`webuntis.utils.timetable_utils.collisions` with the
+        timetables of all classes (or rooms, or teachers). The periods of
+        each resource are sorted and swept once, so this takes ``O(n log n)``
+        time. Cancelled periods don't collide with anything.
+
+        :param fields: The raw fields listing the resources to check.
+        :rtype: list of
+            :py:class:`webuntis.utils.timetable_utils.Collision`
+        """
+        return timetable_utils.collisions(self, fields)
+
 
 class RoomObject(ListItem, ColorMixin):
     """Represents a physical room. Such as a classroom, but also the physics
@@ -805,7 +1051,7 @@ class SubstitutionObject(PeriodObject):
             return None
 
 
-class SubstitutionList(ListResult):
+class SubstitutionList(ListResult, PeriodQueryMixin):
     """A list of substitutions in form of :py:class:`SubstitutionObject` instances."""
     _itemclass = SubstitutionObject
 
@@ -1,7 +1,11 @@
 import datetime
-from typing import List, Tuple, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union
 
 from webuntis import Session
+from webuntis.utils.intervals import IntervalIndex
+from webuntis.utils.timetable_utils import Collision, TimetableDiff
+
+_Q = TypeVar('_Q', bound='PeriodQueryMixin')
 
 
 class Result(object):
@@ -18,6 +22,10 @@ class Result(object):
     def __int__(self) -> int:
         ...
 
+    @property
+    def fingerprint(self) -> bytes:
+        ...
+
     def __hash__(self) -> int:
         ...
 
@@ -47,6 +55,12 @@ class ListResult(Result):
     def __getitem__(self, i: int) -> ListItem:
         ...
 
+    def iter_raw(self) -> Iterator[Dict[str, Any]]:
+        ...
+
+    def iter_views(self, reuse: bool = False) -> Iterator[ListItem]:
+        ...
+
     def __len__(self) -> int:
         ...
 
@@ -224,7 +238,29 @@ class PeriodObject(ListItem):
         ...
 
 
-class PeriodList(ListResult):
+class PeriodQueryMixin:
+    @property
+    def interval_index(self) -> IntervalIndex:
+        ...
+
+    @property
+    def slot_index(self) -> Dict[Tuple[int, int], List[int]]:
+        ...
+
+    def at(self: _Q, date: Union[datetime.date, int], unit: int) -> _Q:
+        ...
+
+    def overlapping(self: _Q, start: datetime.datetime, end: datetime.datetime) -> _Q:
+        ...
+
+    def covering(self: _Q, point: datetime.datetime) -> _Q:
+        ...
+
+    def within(self: _Q, start: datetime.datetime, end: datetime.datetime) -> _Q:
+        ...
+
+
+class PeriodList(ListResult, PeriodQueryMixin):
     _itemclass = PeriodObject
 
     def filter(self, **criterions) -> PeriodList:
@@ -233,12 +269,28 @@ class PeriodList(ListResult):
     def __getitem__(self, i: int) -> PeriodObject:
         ...
 
-    def to_table(self) -> List[Tuple[datetime.time, List[Tuple[datetime.date, PeriodList]]]]:
+    def iter_views(self, reuse: bool = False) -> Iterator[PeriodObject]:
+        ...
+
+    def to_table(self,
+                 dates: Optional[Iterable[datetime.date]] = None,
+                 times: Optional[Iterable[datetime.time]] = None,
+                 timegrid: bool = False) -> List[Tuple[datetime.time, List[Tuple[datetime.date, PeriodList]]]]:
         ...
 
     def combine(self, combine_breaks: bool = True) -> PeriodList:
         ...
 
+    def resolve(self, teachers: bool = True, rooms: bool = True,
+                subjects: bool = True, klassen: bool = True) -> PeriodList:
+        ...
+
+    def diff(self, other: PeriodList) -> TimetableDiff:
+        ...
+
+    def collisions(self, fields: Iterable[str] = ...) -> List[Collision]:
+        ...
+
 
 class PersonObject(ListItem):
 
@@ -384,7 +436,7 @@ class SubstitutionObject(PeriodObject):
         ...
 
 
-class SubstitutionList(ListResult):
+class SubstitutionList(ListResult, PeriodQueryMixin):
     _itemclass = SubstitutionObject
 
     def filter(self, **criterions) -> SubstitutionList:
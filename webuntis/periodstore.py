@@ -0,0 +1,332 @@
+"""
+    This file is part of python-webuntis
+
+    :copyright: (c) 2012 by Markus Unterwaditzer.
+    :license: BSD, see LICENSE for more details.
+
+A read-only file format for timetables that is used through :py:mod:`mmap`
+instead of being loaded, so many processes reading the same file share one
+copy of it in the page cache and opening it takes no time::
+
+    webuntis.periodstore.dump(snapshot.periods, 'school.periods')
+
+    # in every worker process
+    periods = webuntis.periodstore.load('school.periods', session=s)
+    for period in periods.covering(now):
+        ...
+
+The file consists of columns of 32-bit integers, one value per period, for
+the common fields, and a table of all strings. Periods are read from the
+columns when they are accessed. Fields the format has no column for are kept
+as JSON. Requires Python 3.
+"""
+import mmap
+import struct
+import sys
+from array import array
+
+try:
+    from collections.abc import Mapping, Sequence
+except ImportError:  # pragma: no cover
+    from collections import Mapping, Sequence
+
+from webuntis import objects
+from webuntis.utils import intervals, lazyproperty
+from webuntis.utils.third_party import json
+
+_magic = b'WUPS'
+_format_version = 1
+_header = struct.Struct('<4s4I')
+
+#: Marks a missing value in the integer columns.
+_missing = -2 ** 31
+
+_int_fields = (u'id', u'date', u'startTime', u'endTime', u'lsnumber')
+_string_fields = (u'code', u'lstype', u'activityType', u'lstext',
+                  u'statflags', u'substText', u'sg', u'info', u'bkRemark',
+                  u'bkText')
+_element_fields = (u'kl', u'te', u'su', u'ro')
+_known_fields = frozenset(_int_fields + _string_fields + _element_fields)
+
+
+def _is_int(value):
+    return type(value) is int and _missing < value < 2 ** 31
+
+
+def _packable_elements(elements):
+    return isinstance(elements, list) and all(
+        isinstance(e, dict) and _is_int(e.get(u'id')) and
+        set(e) <= set((u'id', u'orgid')) and
+        _is_int(e.get(u'orgid', 0))
+        for e in elements)
+
+
+def dump(periods, path):
+    """Write a :py:class:`webuntis.objects.PeriodList`, or any iterable of
+    periods or their raw data, to the file at ``path``."""
+    rows = list(intervals.iter_raw(periods))
+    n = len(rows)
+
+    strings = []
+    string_ids = {}
+
+    def string(value):
+        try:
+            return string_ids[value]
+        except KeyError:
+            i = string_ids[value] = len(strings)
+            strings.append(value)
+            return i
+
+    int_columns = [array('i', [_missing]) * n for field in _int_fields]
+    string_columns = [array('i', [-1]) * n for field in _string_fields]
+    extras = array('i', [-1]) * n
+    present = array('i', [0]) * n
+    # the elements are stored grouped by field: an offset and the IDs and
+    # original IDs for every field, concatenated later
+    offsets = [array('i', [0]) for field in _element_fields]
+    ids = [array('i') for field in _element_fields]
+    orgids = [array('i') for field in _element_fields]
+
+    for i, row in enumerate(rows):
+        extra = dict((key, value) for key, value in row.items()
+                     if key not in _known_fields)
+        for column, field in zip(int_columns, _int_fields):
+            if field in row:
+                if _is_int(row[field]):
+                    column[i] = row[field]
+                else:
+                    extra[field] = row[field]
+        for column, field in zip(string_columns, _string_fields):
+            if field in row:
+                if isinstance(row[field], type(u'')):
+                    column[i] = string(row[field])
+                else:
+                    extra[field] = row[field]
+
+        for bit, field in enumerate(_element_fields):
+            if field in row and _packable_elements(row[field]):
+                present[i] |= 1 << bit
+                for element in row[field]:
+                    ids[bit].append(element[u'id'])
+                    orgids[bit].append(element.get(u'orgid', _missing))
+            elif field in row:
+                extra[field] = row[field]
+            offsets[bit].append(len(ids[bit]))
+
+        if extra:
+            extras[i] = string(json.dumps(extra, separators=(',', ':')))
+
+    encoded = [value.encode('utf-8') for value in strings]
+    string_offsets = array('i', [0])
+    for value in encoded:
+        string_offsets.append(string_offsets[-1] + len(value))
+
+    flat_offsets = array('i')
+    element_ids = array('i')
+    element_orgids = array('i')
+    for field_offsets, field_ids, field_orgids in zip(offsets, ids, orgids):
+        base = len(element_ids)
+        flat_offsets.extend(base + offset for offset in field_offsets)
+        element_ids.extend(field_ids)
+        element_orgids.extend(field_orgids)
+
+    with open(path, 'wb') as f:
+        f.write(_header.pack(_magic, _format_version, n, len(element_ids),
+                             len(strings)))
+        for column in int_columns + string_columns + \
+                [extras, present, flat_offsets, element_ids, element_orgids,
+                 string_offsets]:
+            if sys.byteorder != 'little':  # pragma: no cover
+                column = array('i', column)
+                column.byteswap()
+            f.write(column.tobytes())
+        f.write(b''.join(encoded))
+
+
+class PeriodStore(object):
+    """An open period file. Usually used through :py:func:`load`."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, n, n_elements, n_strings = \
+            _header.unpack_from(self._mmap)
+        if magic != _magic:
+            raise ValueError('Not a period file.')
+        if version != _format_version:
+            raise ValueError('Unsupported format version: %r' % version)
+        if sys.byteorder != 'little':  # pragma: no cover
+            raise ValueError('Period files are little-endian.')
+
+        self.size = n
+        # the lengths of the columns, in the order they are written
+        lengths = [n] * (len(_int_fields) + len(_string_fields) + 2) + \
+            [n + 1] * len(_element_fields) + \
+            [n_elements, n_elements, n_strings + 1]
+        view = memoryview(self._mmap)
+        columns = []
+        position = _header.size
+        for length in lengths:
+            end = position + length * 4
+            columns.append(view[position:end].cast('i'))
+            position = end
+
+        count = len(_int_fields)
+        self.int_columns = dict(zip(_int_fields, columns[:count]))
+        self.string_columns = dict(zip(
+            _string_fields, columns[count:count + len(_string_fields)]))
+        count += len(_string_fields)
+        self.extras, self.present = columns[count:count + 2]
+        count += 2
+        self.element_offsets = dict(zip(
+            _element_fields, columns[count:count + len(_element_fields)]))
+        count += len(_element_fields)
+        self.element_ids, self.element_orgids, self._string_offsets = \
+            columns[count:]
+        self._strings_start = position
+        self._strings = {}
+
+    def string(self, i):
+        """The string with index ``i`` of the string table."""
+        try:
+            return self._strings[i]
+        except KeyError:
+            start = self._strings_start + self._string_offsets[i]
+            end = self._strings_start + self._string_offsets[i + 1]
+            value = self._strings[i] = self._mmap[start:end].decode('utf-8')
+            return value
+
+    def extra(self, i):
+        """The fields of row ``i`` that are kept as JSON."""
+        index = self.extras[i]
+        if index < 0:
+            return {}
+        return json.loads(self.string(index))
+
+
+class PeriodRow(Mapping):
+    """The raw data of one period, read from a :py:class:`PeriodStore` when
+    accessed. Behaves like the dictionary returned by the API, but is
+    read-only. Use ``dict(row)`` for a real dictionary."""
+
+    __slots__ = ('_store', '_i', '_extra')
+
+    def __init__(self, store, i):
+        self._store = store
+        self._i = i
+        self._extra = None
+
+    def _extras(self):
+        if self._extra is None:
+            self._extra = self._store.extra(self._i)
+        return self._extra
+
+    def __getitem__(self, key):
+        store, i = self._store, self._i
+        column = store.int_columns.get(key)
+        if column is not None and column[i] != _missing:
+            return column[i]
+        column = store.string_columns.get(key)
+        if column is not None and column[i] >= 0:
+            return store.string(column[i])
+        offsets = store.element_offsets.get(key)
+        if offsets is not None and \
+                store.present[i] & 1 << _element_fields.index(key):
+            elements = []
+            for j in range(offsets[i], offsets[i + 1]):
+                element = {u'id': store.element_ids[j]}
+                if store.element_orgids[j] != _missing:
+                    element[u'orgid'] = store.element_orgids[j]
+                elements.append(element)
+            return elements
+        return self._extras()[key]
+
+    def __iter__(self):
+        store, i = self._store, self._i
+        for field in _int_fields:
+            if store.int_columns[field][i] != _missing:
+                yield field
+        for field in _string_fields:
+            if store.string_columns[field][i] >= 0:
+                yield field
+        for bit, field in enumerate(_element_fields):
+            if store.present[i] & 1 << bit:
+                yield field
+        for field in self._extras():
+            yield field
+
+    def __len__(self):
+        return sum(1 for key in self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def __reduce__(self):
+        # copies and pickles are plain dictionaries, the store can't be
+        # pickled
+        return dict, (dict(self),)
+
+
+class PeriodRows(Sequence):
+    """The rows of a :py:class:`PeriodStore` as a read-only sequence of
+    :py:class:`PeriodRow` objects."""
+
+    def __init__(self, store):
+        self._store = store
+
+    def __len__(self):
+        return self._store.size
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return PeriodRow(self._store, i)
+
+
+class MappedPeriodList(objects.PeriodList):
+    """A :py:class:`webuntis.objects.PeriodList` backed by a
+    :py:class:`PeriodStore`. The items are views that are created when
+    accessed and not kept."""
+
+    _cache_items = False
+
+    def iter_raw(self):
+        """See :py:meth:`webuntis.objects.ListResult.iter_raw`. Rows are
+        yielded as plain dictionaries, which unlike the rows can be modified,
+        copied and serialized."""
+        for data in objects.PeriodList.iter_raw(self):
+            yield dict(data) if isinstance(data, PeriodRow) else data
+
+    @lazyproperty
+    def interval_index(self):
+        """See :py:attr:`webuntis.objects.PeriodList.interval_index`, built
+        from the columns directly. Lists derived from this one, e.g. with
+        :py:meth:`filter`, contain item objects instead of the rows of the
+        store and build it like any other list."""
+        if not isinstance(self._data, PeriodRows):
+            return objects.PeriodList.interval_index.fget(self)
+        store = self._data._store
+        dates = store.int_columns[u'date']
+        starts = store.int_columns[u'startTime']
+        ends = store.int_columns[u'endTime']
+        return intervals.IntervalIndex(
+            (intervals.time_key(dates[i], starts[i]),
+             intervals.time_key(dates[i], ends[i]),
+             i)
+            for i in range(store.size)
+        )
+
+
+def load(path, session):
+    """Open a file written by :py:func:`dump`.
+
+    :rtype: :py:class:`MappedPeriodList`
+    """
+    return MappedPeriodList(data=PeriodRows(PeriodStore(path)),
+                            session=session)
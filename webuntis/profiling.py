@@ -0,0 +1,150 @@
+"""
+    This file is part of python-webuntis
+
+    :copyright: (c) 2012 by Markus Unterwaditzer.
+    :license: BSD, see LICENSE for more details.
+
+An opt-in profiler for the construction of results. While it is enabled,
+every evaluation of a lazy property is counted and timed per class and
+attribute, and every item access of a list result per list class::
+
+    import webuntis.profiling
+
+    with webuntis.profiling.profile() as profiler:
+        table = s.timetable(...).to_table()
+    print(profiler.report())
+
+Output::
+
+    what                                     calls  created    total   per call
+    PeriodObject.start                         305        -   0.009s     29.8us
+    PeriodObject.end                           305        -   0.006s     20.7us
+    PeriodList[]                               915      305   0.001s      0.8us
+    [...]
+
+Times of lazy properties include the time spent in the lazy properties they
+use. Nothing is patched while the profiler is disabled, so it costs nothing
+then.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from webuntis.objects import ListResult
+from webuntis.utils.misc import lazyproperty
+
+_timer = getattr(time, 'perf_counter', time.time)
+
+
+class Profiler(object):
+    """Collects the statistics. Use the module-level instance
+    :py:data:`profiler`."""
+
+    def __init__(self):
+        #: ``{(class name, attribute): [calls, seconds]}`` of lazy properties.
+        self.properties = {}
+        #: ``{list class name: [calls, items created, seconds]}`` of list item
+        #: accesses.
+        self.items = {}
+        self._lock = threading.Lock()
+        self._originals = None
+
+    @property
+    def enabled(self):
+        return self._originals is not None
+
+    def enable(self):
+        """Start profiling. Statistics of earlier runs are kept, use
+        :py:meth:`reset` to forget them."""
+        if self.enabled:
+            return
+        self._originals = (lazyproperty.__get__, ListResult.__getitem__)
+        get_property, get_item = self._originals
+        properties, items, lock = self.properties, self.items, self._lock
+
+        def timed_get_property(descriptor, obj, cls):
+            if obj is None:
+                return descriptor
+            start = _timer()
+            try:
+                return get_property(descriptor, obj, cls)
+            finally:
+                duration = _timer() - start
+                key = (type(obj).__name__, descriptor.__name__)
+                with lock:
+                    stats = properties.setdefault(key, [0, 0.0])
+                    stats[0] += 1
+                    stats[1] += duration
+
+        def timed_get_item(result, i):
+            created = type(result._data[i]) is not result._itemclass
+            start = _timer()
+            try:
+                return get_item(result, i)
+            finally:
+                duration = _timer() - start
+                with lock:
+                    stats = items.setdefault(type(result).__name__,
+                                             [0, 0, 0.0])
+                    stats[0] += 1
+                    stats[1] += created
+                    stats[2] += duration
+
+        lazyproperty.__get__ = timed_get_property
+        ListResult.__getitem__ = timed_get_item
+
+    def disable(self):
+        """Stop profiling, keeping the statistics."""
+        if not self.enabled:
+            return
+        lazyproperty.__get__, ListResult.__getitem__ = self._originals
+        self._originals = None
+
+    def reset(self):
+        """Forget all statistics."""
+        with self._lock:
+            self.properties.clear()
+            self.items.clear()
+
+    def report(self, limit=None):
+        """Return the statistics as a table, sorted by the total time.
+
+        :type limit: int
+        :param limit: Only show this many rows.
+        """
+        with self._lock:
+            rows = [('%s.%s' % key, calls, None, total)
+                    for key, (calls, total) in self.properties.items()]
+            rows.extend(('%s[]' % name, calls, created, total)
+                        for name, (calls, created, total)
+                        in self.items.items())
+        rows.sort(key=lambda row: row[3], reverse=True)
+
+        lines = ['%-38s %7s %8s %8s %10s' % (
+            'what', 'calls', 'created', 'total', 'per call')]
+        for what, calls, created, total in rows[:limit]:
+            lines.append('%-38s %7d %8s %7.3fs %8.1fus' % (
+                what, calls, '-' if created is None else created, total,
+                total / calls * 1e6))
+        return '\n'.join(lines)
+
+
+#: The profiler.
+profiler = Profiler()
+
+enable = profiler.enable
+disable = profiler.disable
+reset = profiler.reset
+report = profiler.report
+
+
+@contextmanager
+def profile():
+    """Reset and enable the profiler for the duration of a ``with`` block.
+    Returns the :py:class:`Profiler`."""
+    profiler.reset()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
@@ -0,0 +1,161 @@
+"""
+    This file is part of python-webuntis
+
+    :copyright: (c) 2012 by Markus Unterwaditzer.
+    :license: BSD, see LICENSE for more details.
+
+Recording and replaying of JSON-RPC traffic. A transport is passed to the
+session as the ``transport`` option and is called instead of sending a HTTP
+request::
+
+    with webuntis.recording.Recorder('traffic.jsonl.gz') as recorder:
+        s = webuntis.Session(..., transport=recorder).login()
+        s.timetable(...)
+
+    s = webuntis.Session(..., transport=Replayer('traffic.jsonl.gz'))
+    s.login()
+    s.timetable(...)  # no network involved
+
+Recordings are gzipped files with one JSON object per exchange. The
+credentials of ``authenticate`` requests and the session ID they return are
+not recorded, so recordings can be shared.
+"""
+import gzip
+import threading
+import time
+
+from webuntis import errors
+from webuntis.utils import remote
+from webuntis.utils.third_party import json
+
+_redacted_params = ('user', 'password')
+_redacted_results = ('sessionId',)
+
+
+def _dumps(obj):
+    return json.dumps(obj, sort_keys=True, separators=(',', ':'))
+
+
+def _redact(method, params):
+    if method != u'authenticate':
+        return params
+    return dict((key, u'<redacted>' if key in _redacted_params else value)
+                for key, value in params.items())
+
+
+def _redact_response(method, response):
+    if method != u'authenticate' or \
+            not isinstance(response.get(u'result'), dict):
+        return response
+    response = dict(response)
+    response[u'result'] = dict(
+        (key, u'<redacted>' if key in _redacted_results else value)
+        for key, value in response[u'result'].items())
+    return response
+
+
+class Recorder(object):
+    """A transport which sends requests with another transport, by default
+    the real HTTP one, and appends every exchange to the file at ``path``.
+
+    Use it as context manager or call :py:meth:`close` when done.
+    """
+
+    def __init__(self, path, transport=None):
+        self.path = path
+        self._transport = transport
+        self._file = gzip.open(path, 'wb')
+        self._lock = threading.Lock()
+
+    def __call__(self, url, data, headers, http_session=None):
+        transport = self._transport or remote._send_request
+        start = time.time()
+        result = transport(url, data, headers, http_session)
+        stats = getattr(remote._transfer, 'stats', None) or {}
+
+        method = data[u'method']
+        line = _dumps({
+            'method': method,
+            'params': _redact(method, data[u'params']),
+            'result': _redact_response(method, result),
+            'duration': time.time() - start,
+            'bytes': stats.get('bytes'),
+        })
+        with self._lock:
+            self._file.write((line + '\n').encode('utf-8'))
+        return result
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class Replayer(object):
+    """A transport which answers requests from a recording made by
+    :py:class:`Recorder`.
+
+    Requests are matched by method and parameters, ``authenticate`` requests
+    by method only. If the same request was recorded several times, the
+    responses are replayed in the recorded order, the last one being repeated.
+
+    :param latency: Seconds to wait before every response, or ``'recorded'``
+        to wait as long as the original request took.
+
+    :raises: :py:class:`webuntis.errors.RemoteError` -- If a request is not
+        part of the recording.
+    """
+
+    def __init__(self, path, latency=0):
+        self.latency = latency
+        self._responses = {}
+        self._lock = threading.Lock()
+
+        f = gzip.open(path, 'rb')
+        try:
+            for line in f:
+                entry = json.loads(line.decode('utf-8'))
+                key = self._key(entry['method'], entry['params'])
+                # results get modified by the result classes, so every
+                # replay decodes its own copy
+                entry['result'] = _dumps(entry['result'])
+                self._responses.setdefault(key, []).append(entry)
+        finally:
+            f.close()
+
+    @staticmethod
+    def _key(method, params):
+        if method == u'authenticate':
+            return method, None
+        return method, _dumps(params)
+
+    def __call__(self, url, data, headers, http_session=None):
+        key = self._key(data[u'method'], data[u'params'])
+        with self._lock:
+            try:
+                responses = self._responses[key]
+            except KeyError:
+                raise errors.RemoteError(
+                    'No recorded response for %s %s' % key)
+            entry = responses.pop(0) if len(responses) > 1 else responses[0]
+
+        if self.latency == 'recorded':
+            time.sleep(entry['duration'])
+        elif self.latency:
+            time.sleep(self.latency)
+
+        decode_start = time.time()
+        result = json.loads(entry['result'])
+        result[u'id'] = data[u'id']
+        remote._transfer.stats = {
+            'status': 200,
+            'bytes': entry['bytes'] or len(entry['result']),
+            'duration': entry['duration'],
+            'decode_time': time.time() - decode_start
+        }
+        return result
@@ -4,9 +4,15 @@
     :copyright: (c) 2012 by Markus Unterwaditzer.
     :license: BSD, see LICENSE for more details.
 """
+import threading
+import time
+
 from webuntis import utils, objects, errors
-from webuntis.utils import result_wrapper, log, rpc_request
+from webuntis.utils import result_wrapper, log, rpc_request, remote
 from webuntis.utils.userinput import unicode_string
+from webuntis.utils.tracing import span
+from webuntis.utils.intervals import OccupancyIndex, TimegridIndex
+from webuntis.utils.interning import Interner
 
 
 class JSONRPCSession(object):
@@ -25,11 +31,23 @@ class JSONRPCSession(object):
             'password': None,
             'jsessionid': None,
             'login_repeat': 0,
+            'chunk_days': None,
+            'chunk_workers': None,
+            'transport': None,
             '_http_session': None
         }
         config.update(kwargs)
         self.config.update(config)
 
+        #: A list of callables that get notified about requests and the
+        #: cache, see :py:mod:`webuntis.metrics`.
+        self.observers = []
+
+        #: An :py:class:`webuntis.utils.interning.Interner` all received data
+        #: is passed through, or ``None``.
+        self.interner = None
+        self._login_lock = threading.Lock()
+
     def __enter__(self):
         """Context-manager"""
         return self
@@ -96,7 +114,7 @@ class JSONRPCSession(object):
 
         if 'sessionId' in res:
             sid = self.config['jsessionid'] = res['sessionId']
-            log('debug', 'Did get a jsessionid from the server: ' + sid)
+            log('debug', 'Did get a jsessionid from the server: %s', sid)
         else:
             raise errors.AuthError('Something went wrong while authenticating',
                                    res)
@@ -119,21 +137,80 @@ class JSONRPCSession(object):
 
         data = None
 
-        while data is None:
-            try:
-                data = rpc_request(self.config, method, params or {})
-            except errors.NotLoggedInError:
-                if attempts_left > 0:
-                    self.logout(suppress_errors=True)
-                    self.login()
+        with span('webuntis.request', method=method):
+            while data is None:
+                jsessionid = self._jsessionid()
+                try:
+                    data = self._rpc_request(method, params or {})
+                except errors.NotLoggedInError:
+                    if attempts_left > 0:
+                        self._login_again(jsessionid)
+                    else:
+                        raise errors.NotLoggedInError(
+                            'Tried to login several times, failed. Original '
+                            'method was ' + method)
                 else:
-                    raise errors.NotLoggedInError(
-                        'Tried to login several times, failed. Original method'
-                        ' was ' + method)
-            else:
-                return data
-
-            attempts_left -= 1  # new round!
+                    if self.interner is not None:
+                        data = self.interner(data)
+                    return data
+
+                attempts_left -= 1  # new round!
+
+    def _jsessionid(self):
+        return self.config['jsessionid'] if 'jsessionid' in self.config \
+            else None
+
+    def _login_again(self, failed_jsessionid):
+        """Log in again after a request with ``failed_jsessionid`` failed.
+        Requests running in parallel, such as the chunks of a date range,
+        may fail at the same time. Only the first one logs in again, the
+        others retry with the new session ID."""
+        with self._login_lock:
+            jsessionid = self._jsessionid()
+            if jsessionid is not None and jsessionid != failed_jsessionid:
+                return
+            self.logout(suppress_errors=True)
+            self.login()
+
+    def _rpc_request(self, method, params):
+        if not self.observers:
+            return rpc_request(self.config, method, params)
+
+        remote.pop_transfer_stats()  # forget stale statistics
+        self._notify('request_start', method=method)
+        start = time.time()
+        error = None
+        try:
+            return rpc_request(self.config, method, params)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            stats = remote.pop_transfer_stats() or {}
+            self._notify('request_end',
+                         method=method,
+                         latency=time.time() - start,
+                         bytes=stats.get('bytes'),
+                         decode_time=stats.get('decode_time'),
+                         status=stats.get('status'),
+                         error=error,
+                         error_code=getattr(error, 'code', None))
+
+    def _notify(self, event, **info):
+        """Call all observers with an event name and a dictionary with
+        information about it."""
+        for observer in self.observers:
+            observer(event, info)
+
+    def _cache_evicted(self, key, value):
+        self._notify('cache_evict', method=key[0])
+
+    def _cache_cleared(self, method):
+        if method in (None, 'timetable'):
+            self.timetable_snapshots.clear()
+        # the interner may keep values of the cleared results alive
+        if self.interner is not None:
+            self.interner.clear()
 
 
 class ResultWrapperMixin(object):
@@ -510,6 +587,149 @@ class ResultWrapperMixin(object):
         }, **kwargs)
         return parameters
 
+    def sync_timetable(self, start, end, **type_and_id):
+        """Fetch a timetable and return only what changed since the last call
+        with the same parameters. The previous version is kept in the
+        session, so the first call returns all periods as added::
+
+            changes = s.sync_timetable(klasse=klasse, start=monday, end=friday)
+            for period in changes.added:
+                ...
+
+        Takes the same parameters as :py:meth:`timetable`.
+
+        :rtype: :py:class:`webuntis.utils.timetable_utils.TimetableDiff`
+        """
+        new = self.timetable(start=start, end=end, from_cache=False,
+                             **type_and_id)
+        key = (
+            utils.datetime_utils.format_date(start),
+            utils.datetime_utils.format_date(end),
+            tuple(sorted((element_type, int(element_id))
+                         for element_type, element_id in type_and_id.items()))
+        )
+        old = self.timetable_snapshots.get(key)
+        if old is None:
+            old = objects.PeriodList(data=[], session=self)
+        self.timetable_snapshots[key] = new
+        return old.diff(new)
+
+    def free_rooms(self, start, end, rooms=None, refresh=False):
+        """Get the rooms that are free from ``start`` to ``end``::
+
+            free = s.free_rooms(start=datetime.datetime(2024, 3, 4, 8, 0),
+                                end=datetime.datetime(2024, 3, 4, 9, 40))
+
+        The answer comes from :py:attr:`room_occupancy`. Rooms whose
+        timetables for these days aren't in it yet are fetched and added to
+        it, so later questions about the same days need no requests. Cached
+        timetables are used where possible, but the fetched ones aren't saved
+        in the session cache and don't evict anything from it. Cancelled
+        periods don't occupy a room.
+
+        To fill the index with fewer requests, e.g. from the timetables of all
+        classes, update it yourself::
+
+            s.room_occupancy.update_from(periods, 'ro', monday, friday,
+                                         resources=[r.id for r in s.rooms()])
+
+        :type start: :py:class:`datetime.datetime`
+        :type end: :py:class:`datetime.datetime`
+
+        :param rooms: The rooms to consider, as objects or IDs. Default to all
+            rooms.
+
+        :type refresh: bool
+        :param refresh: Fetch the timetables of all considered rooms again.
+
+        :rtype: :py:class:`webuntis.objects.RoomList`
+        """
+        all_rooms = self.rooms(from_cache=True)
+        if rooms is None:
+            rooms = all_rooms
+        room_ids = [int(room) for room in rooms]
+
+        first = utils.datetime_utils.format_date(start)
+        last = utils.datetime_utils.format_date(end)
+        self._update_index(self.room_occupancy, 'ro', 4, room_ids,
+                           first, last, refresh)
+
+        free = set(self.room_occupancy.free(start, end, room_ids))
+        return type(all_rooms)(
+            parent=all_rooms,
+            data=[room for room in all_rooms if room.id in free]
+        )
+
+    def _update_index(self, index, field, element_type, element_ids,
+                      start, end, refresh):
+        """Add the timetables of the elements ``index`` doesn't cover from
+        ``start`` to ``end`` yet, or of all elements with ``refresh``. They
+        are fetched with :py:func:`webuntis.utils.misc.fetch_ranges`, so
+        filling an index doesn't evict the cached results of the user."""
+        if not refresh:
+            element_ids = [element_id for element_id in element_ids
+                           if not index.covers(element_id, start, end)]
+        requests = [self._create_date_param(end, start, id=element_id,
+                                            type=element_type)
+                    for element_id in element_ids]
+        fetched = utils.misc.fetch_ranges(self, 'timetable', 'getTimetable',
+                                          requests, from_cache=not refresh)
+        for element_id, data in zip(element_ids, fetched):
+            periods = objects.PeriodList(data=data, session=self)
+            index.update(element_id, periods, start, end, field=field)
+
+    def free_teachers(self, date, unit, teachers=None, refresh=False):
+        """Get the teachers that are free in a unit of the timegrid::
+
+            # who could substitute in the third unit on monday?
+            free = s.free_teachers(date=monday, unit=3)
+
+        The answer comes from :py:attr:`teacher_availability`, which is built
+        from :py:meth:`timegrid_units` on first use. Teachers whose timetables
+        for that day aren't in it yet are fetched and added to it, like in
+        :py:meth:`free_rooms`, without filling the session cache. Cancelled
+        periods and periods the teacher was substituted away from don't
+        count.
+
+        To bring a teacher up to date after fetching a new timetable, update
+        the index yourself::
+
+            tt = s.timetable(teacher=teacher, start=monday, end=friday)
+            s.teacher_availability.update(teacher.id, tt, monday, friday,
+                                          field='te')
+
+        :type date: :py:class:`datetime.date` or int
+        :type unit: int
+        :param unit: The unit of the timegrid on that day, starting with
+            ``1``.
+
+        :param teachers: The teachers to consider, as objects or IDs. Default
+            to all teachers.
+
+        :type refresh: bool
+        :param refresh: Fetch the timetables of all considered teachers
+            again.
+
+        :rtype: :py:class:`webuntis.objects.TeacherList`
+        """
+        all_teachers = self.teachers(from_cache=True)
+        if teachers is None:
+            teachers = all_teachers
+        teacher_ids = [int(teacher) for teacher in teachers]
+
+        if self.teacher_availability is None:
+            self.teacher_availability = TimegridIndex(
+                self.timegrid_units(from_cache=True))
+        date = utils.datetime_utils.format_date(date)
+        self._update_index(self.teacher_availability, 'te', 2, teacher_ids,
+                           date, date, refresh)
+
+        free = self.teacher_availability.free_in(date, unit, teacher_ids)
+        return type(all_teachers)(
+            parent=all_teachers,
+            data=[teacher for teacher in all_teachers if teacher.id in free]
+        )
+
     def get_student(self, surname, fore_name, dob=0):
         """
         Search for a student by name
@@ -636,6 +856,17 @@ class Session(JSONRPCSession, ResultWrapperMixin):
             s.cache.clear('timetable')  # clears all cached timetables
             s.cache.clear()  # clears everything from the cache
 
+        Timetables and substitutions are additionally cached day by day for
+        each element, so requesting a part of an already fetched range is a
+        cache hit, and for overlapping ranges only the missing days get
+        fetched::
+
+            s.timetable(klasse=123, start=monday, end=sunday)
+            s.timetable(klasse=123, start=monday, end=friday,
+                        from_cache=True)  # no request
+            s.timetable(klasse=123, start=friday, end=next_friday,
+                        from_cache=True)  # only fetches the next week
+
     :type jsessionid: str
     :param jsessionid: The session key to use. You usually shouldn't touch
         this.
@@ -647,6 +878,44 @@ class Session(JSONRPCSession, ResultWrapperMixin):
 
     :type use_cache: bool
     :param use_cache: always use the cache
+
+    :type chunk_days: int
+    :param chunk_days: Split the date range of :py:meth:`timetable`,
+        :py:meth:`substitutions`, :py:meth:`exams` and
+        :py:meth:`class_reg_events` into chunks of this many days. The chunks
+        are fetched in parallel and merged into one result. This avoids
+        :py:class:`webuntis.errors.DateNotAllowed` for long ranges. Chunks
+        are aligned to mondays, so ``7`` means calendar weeks::
+
+            s = webuntis.Session(..., chunk_days=7, cachelen=100)
+            s.timetable(klasse=123, start=jan1, end=jun30)
+
+        Each chunk is saved in the cache on its own. When requesting a
+        sliding window with ``from_cache=True``, only the chunks which are
+        not cached yet get fetched. Disabled by default.
+
+    :type observers: list
+    :param observers: Callables that get notified about every request and
+        about cache hits, misses and evictions, for example a
+        :py:class:`webuntis.metrics.MetricsCollector`. They are saved in the
+        :py:attr:`observers` attribute, not in the configuration dictionary.
+
+    :type chunk_workers: int
+    :param chunk_workers: The maximum number of chunks fetched at the same
+        time. Default to ``4``.
+
+    :param transport: A callable that is used instead of sending HTTP
+        requests, for example a :py:class:`webuntis.recording.Recorder` or
+        :py:class:`webuntis.recording.Replayer`.
+
+    :type intern_data: bool
+    :param intern_data: Pass all received data through a
+        :py:class:`webuntis.utils.interning.Interner`, so repeated strings
+        and the elements listed in periods, such as teachers and rooms, are
+        kept in memory once for all results. Saves memory with many or long
+        timetables. The interner is saved in the :py:attr:`interner`
+        attribute, not in the configuration dictionary, and is cleared
+        together with the cache. Default to ``False``.
     """
 
     cache = None
@@ -664,4 +933,20 @@ class Session(JSONRPCSession, ResultWrapperMixin):
             del config['use_cache']
         cachelen = config.pop('cachelen', 20)
         self.cache = utils.SessionCache(maxlen=cachelen)
+        self.cache.on_evict = self.cache.ranges.on_evict = self._cache_evicted
+        #: The timetables last seen by :py:meth:`sync_timetable`, as many as
+        #: the cache holds. Cleared together with the cache.
+        self.timetable_snapshots = utils.LruDict(maxlen=cachelen)
+        #: The :py:class:`webuntis.utils.intervals.OccupancyIndex` of rooms
+        #: used by :py:meth:`free_rooms`.
+        self.room_occupancy = OccupancyIndex()
+        #: The :py:class:`webuntis.utils.intervals.TimegridIndex` of teachers
+        #: used by :py:meth:`free_teachers`, ``None`` until it is first used.
+        self.teacher_availability = None
+        observers = config.pop('observers', ())
+        intern_data = config.pop('intern_data', False)
         JSONRPCSession.__init__(self, **config)
+        self.observers.extend(observers)
+        if intern_data:
+            self.interner = Interner()
+        self.cache.on_clear = self._cache_cleared
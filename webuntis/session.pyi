@@ -1,7 +1,10 @@
 import datetime
-from typing import Any, Union, Dict
+from typing import Any, Callable, Union, Dict, Iterable, List, Optional
 
 from webuntis import objects, utils
+from webuntis.utils.interning import Interner
+from webuntis.utils.intervals import OccupancyIndex, TimegridIndex
+from webuntis.utils.timetable_utils import TimetableDiff
 
 
 class JSONRPCSession:
@@ -77,6 +80,18 @@ class ResultWrapperMixin:
 
     def class_reg_category_groups(self) -> objects.ClassRegCategoryGroupList: ...
 
+    def sync_timetable(self,
+                       start: Union[datetime.datetime, datetime.date, int],
+                       end: Union[datetime.datetime, datetime.date, int], **type_and_id) -> TimetableDiff: ...
+
+    def free_rooms(self, start: datetime.datetime, end: datetime.datetime,
+                   rooms: Iterable[Union[objects.RoomObject, int]] = ...,
+                   refresh: bool = ...) -> objects.RoomList: ...
+
+    def free_teachers(self, date: Union[datetime.date, int], unit: int,
+                      teachers: Iterable[Union[objects.TeacherObject, int]] = ...,
+                      refresh: bool = ...) -> objects.TeacherList: ...
+
     def get_student(self, surname: str, fore_name: str, dob: int = ...) -> objects.StudentObject: ...
 
     def get_teacher(self, surname: str, fore_name: str, dob: int = ...) -> objects.TeacherObject: ...
@@ -84,5 +99,10 @@ class ResultWrapperMixin:
 
 class Session(JSONRPCSession, ResultWrapperMixin):
     cache: utils.SessionCache = ...
+    observers: List[Callable[[str, Dict[str, Any]], Any]] = ...
+    interner: Optional[Interner] = ...
+    timetable_snapshots: utils.LruDict = ...
+    room_occupancy: OccupancyIndex = ...
+    teacher_availability: Optional[TimegridIndex] = ...
 
     def __init__(self, **config) -> None: ...
@@ -0,0 +1,202 @@
+"""
+    This file is part of python-webuntis
+
+    :copyright: (c) 2012 by Markus Unterwaditzer.
+    :license: BSD, see LICENSE for more details.
+
+A whole school in memory: master data and the timetables of all classes for
+a time range, fetched once::
+
+    snapshot = webuntis.snapshot.SchoolSnapshot.fetch(s, monday, friday)
+    snapshot.save('school.json.gz')
+
+    snapshot = webuntis.snapshot.SchoolSnapshot.load('school.json.gz')
+    for period in snapshot.timetable(klasse=1):
+        print(period.teachers, period.rooms)
+
+The snapshot takes the place of the session for the results it contains:
+properties such as :py:attr:`webuntis.objects.PeriodObject.teachers` look up
+the snapshot's master data, which exists only once for all timetables.
+"""
+import gzip
+
+from webuntis import objects
+from webuntis.utils import lazyproperty
+from webuntis.utils.datetime_utils import format_date
+from webuntis.utils.misc import chunk_workers, parallel_map
+from webuntis.utils.third_party import json
+
+#: The master data of a snapshot: the name of the session method, the
+#: JSON-RPC method and the result class.
+_master_data = (
+    ('klassen', u'getKlassen', objects.KlassenList),
+    ('teachers', u'getTeachers', objects.TeacherList),
+    ('rooms', u'getRooms', objects.RoomList),
+    ('subjects', u'getSubjects', objects.SubjectList),
+    ('timegrid_units', u'getTimegridUnits', objects.TimegridObject),
+    ('statusdata', u'getStatusData', objects.StatusData),
+)
+
+_format_version = 1
+
+
+def _raw(result):
+    if hasattr(result, 'iter_raw'):
+        return list(result.iter_raw())
+    return getattr(result, '_data', result)
+
+
+class SchoolSnapshot(object):
+    """The master data and the timetables of all classes of a school from
+    ``start`` to ``end``. Usually created with :py:meth:`fetch` or
+    :py:meth:`load`.
+
+    :param master_data: A dictionary with the raw results of
+        :py:meth:`webuntis.Session.klassen`, ``teachers``, ``rooms``,
+        ``subjects``, ``timegrid_units`` and ``statusdata``, by method name.
+    :param timetables: A dictionary with the raw timetable of every class, by
+        class ID.
+    """
+
+    def __init__(self, start, end, master_data, timetables):
+        self.start = format_date(start)
+        self.end = format_date(end)
+        self._master = dict(
+            (name, result_class(data=master_data[name], session=self))
+            for name, method, result_class in _master_data
+        )
+        #: The :py:class:`webuntis.objects.PeriodList` of every class, by
+        #: class ID.
+        self.timetables = dict(
+            (int(klasse_id), objects.PeriodList(data=data, session=self))
+            for klasse_id, data in timetables.items()
+        )
+
+    @classmethod
+    def fetch(cls, session, start, end, workers=None):
+        """Fetch everything from the API. The requests are made in parallel
+        and bypass the session's cache.
+
+        :param session: A logged in :py:class:`webuntis.Session`.
+        :param workers: The maximum number of requests at the same time.
+            Default to the session's ``chunk_workers`` option or ``4``.
+        """
+        if workers is None:
+            workers = chunk_workers(session)
+
+        results = parallel_map(
+            lambda method: session._request(method),
+            [method for name, method, result_class in _master_data],
+            workers)
+        master_data = dict(
+            (name, result)
+            for (name, method, result_class), result
+            in zip(_master_data, results)
+        )
+
+        klasse_ids = [klasse[u'id'] for klasse in master_data['klassen']]
+        start_date, end_date = format_date(start), format_date(end)
+        results = parallel_map(
+            lambda klasse_id: session._request(u'getTimetable', {
+                u'id': klasse_id,
+                u'type': 1,
+                u'startDate': start_date,
+                u'endDate': end_date,
+            }),
+            klasse_ids, workers)
+
+        return cls(start, end, master_data, dict(zip(klasse_ids, results)))
+
+    def save(self, path):
+        """Save the snapshot as a gzipped JSON file."""
+        data = {
+            'version': _format_version,
+            'start': self.start,
+            'end': self.end,
+            'master_data': dict((name, _raw(result))
+                                for name, result in self._master.items()),
+            'timetables': [[klasse_id, _raw(periods)]
+                           for klasse_id, periods
+                           in sorted(self.timetables.items())],
+        }
+        f = gzip.open(path, 'wb')
+        try:
+            f.write(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+        finally:
+            f.close()
+
+    @classmethod
+    def load(cls, path):
+        """Load a snapshot saved with :py:meth:`save`."""
+        f = gzip.open(path, 'rb')
+        try:
+            data = json.loads(f.read().decode('utf-8'))
+        finally:
+            f.close()
+        if data.get('version') != _format_version:
+            raise ValueError('Unsupported snapshot version: %r'
+                             % data.get('version'))
+        return cls(data['start'], data['end'], data['master_data'],
+                   dict(data['timetables']))
+
+    # The master data, in the same form as the session's methods, so the
+    # contained results can use the snapshot as their session.
+
+    def klassen(self, **kwargs):
+        """The :py:class:`webuntis.objects.KlassenList`."""
+        return self._master['klassen']
+
+    def teachers(self, **kwargs):
+        """The :py:class:`webuntis.objects.TeacherList`."""
+        return self._master['teachers']
+
+    def rooms(self, **kwargs):
+        """The :py:class:`webuntis.objects.RoomList`."""
+        return self._master['rooms']
+
+    def subjects(self, **kwargs):
+        """The :py:class:`webuntis.objects.SubjectList`."""
+        return self._master['subjects']
+
+    def timegrid_units(self, **kwargs):
+        """The :py:class:`webuntis.objects.TimegridObject`."""
+        return self._master['timegrid_units']
+
+    def statusdata(self, **kwargs):
+        """The :py:class:`webuntis.objects.StatusData`."""
+        return self._master['statusdata']
+
+    def timetable(self, klasse, **kwargs):
+        """The timetable of a class, given as object or ID.
+
+        :rtype: :py:class:`webuntis.objects.PeriodList`
+        """
+        return self.timetables[int(klasse)]
+
+    @lazyproperty
+    def periods(self):
+        """All periods of the school, each one once, ordered by date and
+        time. The items are the same objects as in :py:attr:`timetables`.
+
+        :rtype: :py:class:`webuntis.objects.PeriodList`
+        """
+        seen = set()
+        items = []
+        for klasse_id, periods in sorted(self.timetables.items()):
+            for period in periods:
+                if period.id not in seen:
+                    seen.add(period.id)
+                    items.append(period)
+        items.sort(key=lambda period: (int(period._data[u'date']),
+                                       int(period._data[u'startTime'])))
+        return objects.PeriodList(data=items, session=self)
+
+    def resolve(self):
+        """Look up the teachers, rooms, subjects and classes of all periods,
+        see :py:meth:`webuntis.objects.PeriodList.resolve`.
+
+        :returns: The snapshot itself.
+        """
+        for periods in self.timetables.values():
+            periods.resolve()
+        return self
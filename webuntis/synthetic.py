@@ -0,0 +1,286 @@
+"""
+    This file is part of python-webuntis
+
+    :copyright: (c) 2012 by Markus Unterwaditzer.
+    :license: BSD, see LICENSE for more details.
+
+Synthetic, internally consistent school data for load and scale tests::
+
+    school = webuntis.synthetic.SyntheticSchool(classes=100, weeks=4)
+    periods = webuntis.objects.PeriodList(
+        data=school.timetable(1, klasse_id, school.start, school.end),
+        session=session)
+
+:py:meth:`SyntheticSchool.call` answers JSON-RPC calls, which is what the
+fake server of the benchmarks uses.
+"""
+import datetime
+import random
+
+from webuntis.utils.datetime_utils import format_date
+
+_forenames = ('Anna', 'Ben', 'Clara', 'David', 'Emma', 'Felix', 'Greta',
+              'Hannah', 'Jonas', 'Lena', 'Lukas', 'Marie', 'Noah', 'Paul')
+_surnames = ('Bauer', 'Fischer', 'Hofer', 'Huber', 'Koch', 'Maier',
+             'Mueller', 'Schmid', 'Schneider', 'Wagner', 'Weber', 'Wolf')
+
+
+class SyntheticSchool(object):
+    """A school with a randomly generated, but reproducible timetable.
+
+    Every lesson slot has at most one class per teacher and per room, so the
+    generated timetables have no double bookings. Substituted periods get a
+    different teacher which is free at that time.
+
+    :param classes: Number of school classes.
+    :param weeks: Number of weeks with periods, starting at ``start``.
+    :param start: The monday of the first week.
+    :param teachers: Number of teachers, at least ``classes``. Defaults to
+        three times the number of classes.
+    :param rooms: Number of rooms, at least ``classes``. Defaults to the number
+        of classes plus ten.
+    :param subjects: Number of subjects.
+    :param students_per_class: Number of students of each class.
+    :param units_per_day: Number of units of the timegrid.
+    :param substitution_rate: Probability of a period having a substitute
+        teacher.
+    :param cancellation_rate: Probability of a period being cancelled.
+    :param seed: Seed for the random number generator.
+    """
+
+    def __init__(self, classes=10, weeks=1, start=datetime.date(2024, 3, 4),
+                 teachers=None, rooms=None, subjects=15,
+                 students_per_class=25, units_per_day=8,
+                 substitution_rate=0.05, cancellation_rate=0.02, seed=0):
+        teachers = teachers or classes * 3
+        rooms = rooms or classes + 10
+        if teachers < classes or rooms < classes:
+            raise ValueError('Need at least as many teachers and rooms as '
+                             'classes.')
+
+        rng = random.Random(seed)
+        self.start = start - datetime.timedelta(days=start.weekday())
+        self.end = self.start + datetime.timedelta(weeks=weeks, days=-1)
+
+        self._klassen = [
+            {'id': i, 'name': '%d%s' % (i // 4 + 1, 'ABCD'[i % 4]),
+             'longName': 'Klasse %d' % i, 'active': True}
+            for i in range(1, classes + 1)]
+        self._teachers = [
+            {'id': i, 'name': 'T%03d' % i,
+             'foreName': rng.choice(_forenames),
+             'longName': rng.choice(_surnames), 'title': ''}
+            for i in range(1, teachers + 1)]
+        self._rooms = [
+            {'id': i, 'name': 'R%03d' % i, 'longName': 'Room %d' % i}
+            for i in range(1, rooms + 1)]
+        self._subjects = [
+            {'id': i, 'name': 'SU%02d' % i, 'longName': 'Subject %d' % i}
+            for i in range(1, subjects + 1)]
+        self._students = []
+        for klasse in self._klassen:
+            for i in range(students_per_class):
+                forename = rng.choice(_forenames)
+                surname = rng.choice(_surnames)
+                student_id = len(self._students) + 1
+                self._students.append({
+                    'id': student_id, 'key': str(100000 + student_id),
+                    'name': '%s%s' % (surname, forename),
+                    'foreName': forename, 'longName': surname,
+                    'gender': rng.choice(('male', 'female'))})
+
+        self._units = []
+        for unit in range(units_per_day):
+            minutes = 8 * 60 + unit * 55
+            self._units.append({
+                'name': str(unit + 1),
+                'startTime': _hhmm(minutes),
+                'endTime': _hhmm(minutes + 50)})
+
+        self._periods = []
+        self._substitutions = []
+        lessons_per_day = dict((klasse['id'], rng.randint(
+            max(1, units_per_day - 3), units_per_day))
+            for klasse in self._klassen)
+        teacher_ids = [t['id'] for t in self._teachers]
+        room_ids = [r['id'] for r in self._rooms]
+        subject_ids = [s['id'] for s in self._subjects]
+
+        # the week plan: (weekday, unit) -> [(klasse, subject, teacher, room)]
+        plan = {}
+        for weekday in range(5):
+            for unit in range(units_per_day):
+                busy_teachers = rng.sample(teacher_ids, classes)
+                busy_rooms = rng.sample(room_ids, classes)
+                plan[weekday, unit] = [
+                    (klasse['id'], rng.choice(subject_ids), teacher, room)
+                    for klasse, teacher, room
+                    in zip(self._klassen, busy_teachers, busy_rooms)
+                    if unit < lessons_per_day[klasse['id']]]
+
+        for day in range(weeks * 7):
+            date = self.start + datetime.timedelta(days=day)
+            if date.weekday() > 4:
+                continue
+            for unit in range(units_per_day):
+                lessons = plan[date.weekday(), unit]
+                free = list(set(teacher_ids) - set(l[2] for l in lessons))
+                for lesson in lessons:
+                    self._add_period(rng, date, unit, lesson, free,
+                                     substitution_rate, cancellation_rate)
+
+        self._by_element = {}
+        for period in self._periods:
+            for element_type, field in ((1, 'kl'), (2, 'te'), (3, 'su'),
+                                        (4, 'ro')):
+                for element in period[field]:
+                    self._by_element.setdefault(
+                        (element_type, element['id']), []).append(period)
+
+    def _add_period(self, rng, date, unit, lesson, free_teachers,
+                    substitution_rate, cancellation_rate):
+        klasse, subject, teacher, room = lesson
+        period = {
+            'id': len(self._periods) + 1,
+            'date': int(date.strftime('%Y%m%d')),
+            'startTime': self._units[unit]['startTime'],
+            'endTime': self._units[unit]['endTime'],
+            'kl': [{'id': klasse}],
+            'te': [{'id': teacher}],
+            'su': [{'id': subject}],
+            'ro': [{'id': room}],
+            'activityType': 'Unterricht',
+        }
+        substitution = None
+        chance = rng.random()
+        if chance < cancellation_rate:
+            period['code'] = 'cancelled'
+            substitution = 'cancel'
+        elif chance < cancellation_rate + substitution_rate and free_teachers:
+            substitute = free_teachers.pop(rng.randrange(len(free_teachers)))
+            period['code'] = 'irregular'
+            period['te'] = [{'id': substitute, 'orgid': teacher}]
+            substitution = 'subst'
+
+        self._periods.append(period)
+        if substitution is not None:
+            self._substitutions.append(
+                self._substitution(period, substitution))
+
+    def _substitution(self, period, substitution_type):
+        def named(elements, master):
+            result = []
+            for element in elements:
+                named_element = {'id': element['id'],
+                                 'name': master[element['id'] - 1]['name']}
+                if 'orgid' in element:
+                    named_element['orgid'] = element['orgid']
+                    named_element['orgname'] = \
+                        master[element['orgid'] - 1]['name']
+                result.append(named_element)
+            return result
+
+        return {
+            'type': substitution_type,
+            'lsid': period['id'],
+            'date': period['date'],
+            'startTime': period['startTime'],
+            'endTime': period['endTime'],
+            'kl': named(period['kl'], self._klassen),
+            'te': named(period['te'], self._teachers),
+            'su': named(period['su'], self._subjects),
+            'ro': named(period['ro'], self._rooms),
+        }
+
+    def klassen(self):
+        """The raw result of ``getKlassen``."""
+        return list(self._klassen)
+
+    def teachers(self):
+        """The raw result of ``getTeachers``."""
+        return list(self._teachers)
+
+    def rooms(self):
+        """The raw result of ``getRooms``."""
+        return list(self._rooms)
+
+    def subjects(self):
+        """The raw result of ``getSubjects``."""
+        return list(self._subjects)
+
+    def students(self):
+        """The raw result of ``getStudents``."""
+        return list(self._students)
+
+    def timegrid_units(self):
+        """The raw result of ``getTimegridUnits``, monday to friday."""
+        return [{'day': day, 'timeUnits': self._units}
+                for day in range(2, 7)]
+
+    def statusdata(self):
+        """The raw result of ``getStatusData``."""
+        return {
+            'lstypes': [{'ls': {'foreColor': '000000',
+                                'backColor': 'ee7f00'}}],
+            'codes': [{'cancelled': {'foreColor': 'FFFFFF',
+                                     'backColor': 'FF0000'}},
+                      {'irregular': {'foreColor': 'FFFFFF',
+                                     'backColor': '8B008B'}}],
+        }
+
+    def timetable(self, element_type, element_id, start=None, end=None):
+        """The raw result of ``getTimetable``.
+
+        :param element_type: ``1`` (klasse), ``2`` (teacher), ``3``
+            (subject) or ``4`` (room).
+        """
+        start, end = self._range(start, end)
+        return [period for period
+                in self._by_element.get((element_type, element_id), [])
+                if start <= period['date'] <= end]
+
+    def all_periods(self, start=None, end=None):
+        """All periods of all classes."""
+        start, end = self._range(start, end)
+        return [period for period in self._periods
+                if start <= period['date'] <= end]
+
+    def substitutions(self, start=None, end=None):
+        """The raw result of ``getSubstitutions``."""
+        start, end = self._range(start, end)
+        return [s for s in self._substitutions
+                if start <= s['date'] <= end]
+
+    def _range(self, start, end):
+        return (format_date(start or self.start),
+                format_date(end or self.end))
+
+    def call(self, method, params):
+        """Answer a JSON-RPC call, returning the ``result``.
+
+        :raises: :exc:`KeyError` for unknown methods.
+        """
+        if method == 'authenticate':
+            return {'sessionId': 'SYNTHETIC', 'personType': 2,
+                    'personId': 1}
+        elif method == 'logout':
+            return None
+        elif method == 'getTimetable':
+            return self.timetable(params['type'], params['id'],
+                                  params['startDate'], params['endDate'])
+        elif method == 'getSubstitutions':
+            return self.substitutions(params['startDate'], params['endDate'])
+
+        return {
+            'getKlassen': self.klassen,
+            'getTeachers': self.teachers,
+            'getRooms': self.rooms,
+            'getSubjects': self.subjects,
+            'getStudents': self.students,
+            'getTimegridUnits': self.timegrid_units,
+            'getStatusData': self.statusdata,
+        }[method]()
+
+
+def _hhmm(minutes):
+    return (minutes // 60) * 100 + minutes % 60
@@ -8,8 +8,10 @@
 from .userinput import config_keys
 from .misc import FilterDict, \
     SessionCache, \
+    RangeCache, \
     LruDict, \
     cache_key, \
+    fingerprint, \
     lazyproperty, \
     result_wrapper
 from .logger import log
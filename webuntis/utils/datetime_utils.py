@@ -51,6 +51,40 @@ def _format(obj, form):
         return int(obj)
 
 
+def split_date_range(start, end, days):
+    """Split the date range from ``start`` to ``end`` (both inclusive,
+    formatted like ``20120303``) into consecutive ``(start, end)`` chunks.
+
+    Chunks are aligned to multiples of ``days`` counted from a monday, so
+    ``days=7`` splits into calendar weeks and overlapping ranges share the
+    same chunk boundaries."""
+    if days < 1:
+        raise ValueError('Chunks must be at least one day long.')
+    first = parse_date(start).date().toordinal()
+    last = parse_date(end).date().toordinal()
+
+    chunks = []
+    while first <= last:
+        # ordinal 1 (0001-01-01) is a monday
+        chunk_end = min(last, first + days - 1 - (first - 1) % days)
+        chunks.append((
+            format_date(datetime.date.fromordinal(first)),
+            format_date(datetime.date.fromordinal(chunk_end))
+        ))
+        first = chunk_end + 1
+
+    return chunks
+
+
+def days_between(start, end):
+    """All dates from ``start`` to ``end`` (both inclusive), formatted like
+    ``20120303``."""
+    first = parse_date(start).date().toordinal()
+    last = parse_date(end).date().toordinal()
+    return [format_date(datetime.date.fromordinal(day))
+            for day in range(first, last + 1)]
+
+
 def _satinize(raw_date, form):
     """Convert a raw date/time integer or string to a string with fixed length."""
     form_string, formlen = forms[form]
@@ -0,0 +1,86 @@
+"""
+    This file is part of python-webuntis
+
+    :copyright: (c) 2013 by Markus Unterwaditzer.
+    :license: BSD, see LICENSE for more details.
+"""
+
+#: The fields of periods and substitutions that list elements, such as
+#: ``[{u'id': 1, u'name': u'1A'}]``.
+element_fields = frozenset((u'kl', u'te', u'su', u'ro'))
+
+
+class Interner(object):
+    """Shrinks raw API data by making equal values the same objects. Every
+    distinct string is kept once, and equal element dictionaries of
+    :py:data:`element_fields` are replaced by one shared dictionary, so a
+    teacher listed in thousands of periods exists once in memory::
+
+        interner = Interner()
+        data = interner(session._request('getTimetable', {...}))
+
+    The returned data is equal to the given one and used like it, but the
+    shared element dictionaries must not be modified. Used by
+    :py:class:`webuntis.Session` with ``intern_data=True``, which clears it
+    together with its cache.
+
+    :param maxlen: The maximum number of kept strings and elements. When
+        there are more, everything is forgotten, so data which isn't used
+        anymore doesn't stay in memory forever. Data interned before just
+        doesn't share its values with data interned afterwards.
+    """
+
+    def __init__(self, maxlen=100000):
+        self.maxlen = maxlen
+        self._strings = {}
+        self._elements = {}
+
+    def __len__(self):
+        return len(self._strings) + len(self._elements)
+
+    def clear(self):
+        """Forget all strings and elements."""
+        self._strings.clear()
+        self._elements.clear()
+
+    def string(self, value):
+        """The kept string equal to ``value``."""
+        return self._strings.setdefault(value, value)
+
+    def element(self, element):
+        """The shared dictionary equal to the element dictionary
+        ``element``."""
+        element = self._intern(element)
+        try:
+            key = tuple(sorted(element.items()))
+            return self._elements.setdefault(key, element)
+        except TypeError:  # unhashable values
+            return element
+
+    def __call__(self, value):
+        """Return ``value``, raw data as decoded from JSON, with equal values
+        replaced. Dictionaries and lists are copied, not modified."""
+        if self.maxlen is not None and len(self) > self.maxlen:
+            self.clear()
+        return self._intern(value)
+
+    def _intern(self, value):
+        if isinstance(value, dict):
+            string = self.string
+            result = {}
+            for key, item in value.items():
+                if isinstance(key, type(u'')):
+                    key = string(key)
+                if key in element_fields and isinstance(item, list):
+                    result[key] = [self.element(element)
+                                   if isinstance(element, dict)
+                                   else self._intern(element)
+                                   for element in item]
+                else:
+                    result[key] = self._intern(item)
+            return result
+        elif isinstance(value, list):
+            return [self._intern(item) for item in value]
+        elif isinstance(value, type(u'')):
+            return self.string(value)
+        return value
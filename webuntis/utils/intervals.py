@@ -0,0 +1,294 @@
+"""
+    This file is part of python-webuntis
+
+    :copyright: (c) 2013 by Markus Unterwaditzer.
+    :license: BSD, see LICENSE for more details.
+"""
+
+from bisect import bisect_left, bisect_right
+
+from .datetime_utils import format_date, format_time, days_between, \
+    parse_date
+
+
+def time_key(date, time):
+    """Turn a date and a time, formatted like ``20120303`` and ``800``, into
+    one integer that sorts like the point in time it stands for."""
+    return int(date) * 10000 + int(time)
+
+
+def datetime_key(obj):
+    """:py:func:`time_key` of a :py:class:`datetime.datetime`."""
+    return time_key(format_date(obj), format_time(obj))
+
+
+def iter_raw(periods):
+    """Iterate over the raw data of periods, given as a
+    :py:class:`webuntis.objects.PeriodList` or any iterable of period objects
+    or dictionaries."""
+    if hasattr(periods, 'iter_raw'):
+        return periods.iter_raw()
+    return (getattr(period, '_data', period) for period in periods)
+
+
+def merge(intervals):
+    """Sort ``(start, end)`` pairs and merge those that overlap or touch."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+
+class OccupancyIndex(object):
+    """When resources such as rooms or teachers are occupied, built from
+    periods. For every resource, the occupied times are kept as sorted,
+    merged intervals, so checking whether a resource is free takes
+    logarithmic time.
+
+    The index also remembers the days it knows about for every resource:
+    periods on other days are unknown, not free.
+    """
+
+    def __init__(self):
+        self._starts = {}
+        self._ends = {}
+        self._days = {}
+
+    def update(self, resource, periods, start, end, field=None):
+        """Replace what is known about ``resource`` from date ``start`` to
+        ``end`` (both inclusive) by ``periods``. Cancelled periods don't
+        occupy anything.
+
+        :param resource: The ID of the resource.
+        :param periods: The periods of the resource in that time, see
+            :py:func:`iter_raw`.
+        :param field: If given, only periods that list ``resource`` in this
+            field occupy it. Timetables may contain periods a teacher or room
+            was substituted away from, which then only appear as ``orgid``.
+        """
+        start, end = format_date(start), format_date(end)
+        lower, upper = time_key(start, 0), time_key(end, 2400)
+
+        intervals = [
+            (s, e) for s, e in zip(self._starts.get(resource, ()),
+                                   self._ends.get(resource, ()))
+            if not lower <= s <= upper
+        ]
+        for period in iter_raw(periods):
+            if period.get(u'code') == u'cancelled':
+                continue
+            if field is not None and not any(
+                    element[u'id'] == resource
+                    for element in period.get(field, ())):
+                continue
+            intervals.append((
+                time_key(period[u'date'], period[u'startTime']),
+                time_key(period[u'date'], period[u'endTime'])
+            ))
+
+        merged = merge(intervals)
+        self._starts[resource] = [s for s, e in merged]
+        self._ends[resource] = [e for s, e in merged]
+        days = self._days.setdefault(resource, set())
+        days.update(days_between(start, end))
+
+    def update_from(self, periods, field, start, end, resources=()):
+        """Update all resources from periods that contain several of them,
+        such as the timetables of all classes of a school.
+
+        :param field: The field of the raw periods listing the resources,
+            ``ro`` for rooms or ``te`` for teachers.
+        :param resources: IDs of resources that are known to be free if they
+            don't appear in ``periods``.
+        """
+        by_resource = dict((resource, []) for resource in resources)
+        for period in iter_raw(periods):
+            for element in period.get(field, ()):
+                by_resource.setdefault(element[u'id'], []).append(period)
+
+        for resource, resource_periods in by_resource.items():
+            self.update(resource, resource_periods, start, end)
+
+    def covers(self, resource, start, end):
+        """Whether every day from date ``start`` to ``end`` is known for
+        ``resource``."""
+        days = self._days.get(resource, ())
+        return all(day in days for day in days_between(start, end))
+
+    def is_free(self, resource, start, end):
+        """Whether ``resource`` is free from ``start`` to ``end``, given as
+        :py:class:`datetime.datetime` objects."""
+        return self._is_free(resource, datetime_key(start), datetime_key(end))
+
+    def _is_free(self, resource, start, end):
+        ends = self._ends.get(resource, ())
+        # the first interval that ends after the start
+        i = bisect_right(ends, start)
+        return i == len(ends) or self._starts[resource][i] >= end
+
+    def free(self, start, end, resources):
+        """The IDs of ``resources`` that are free from ``start`` to ``end``,
+        given as :py:class:`datetime.datetime` objects."""
+        start, end = datetime_key(start), datetime_key(end)
+        return [resource for resource in resources
+                if self._is_free(resource, start, end)]
+
+
+def untis_day(date):
+    """The number WebUntis uses for the weekday of ``date``, 1 being sunday
+    and 7 saturday."""
+    if not hasattr(date, 'isoweekday'):
+        date = parse_date(date)
+    return date.isoweekday() % 7 + 1
+
+
+def timegrid_units(timegrid):
+    """The units of a timegrid as ``{day: [(start, end), ...]}``, the days
+    numbered like :py:func:`untis_day` and the units sorted by start.
+
+    :param timegrid: The result of
+        :py:meth:`webuntis.Session.timegrid_units`, or its raw data.
+    """
+    return dict(
+        (day[u'day'], sorted((unit[u'startTime'], unit[u'endTime'])
+                             for unit in day[u'timeUnits']))
+        for day in iter_raw(timegrid)
+    )
+
+
+class TimegridIndex(OccupancyIndex):
+    """An :py:class:`OccupancyIndex` that additionally knows which resources
+    are occupied in which unit of the timegrid, so all the free resources of
+    one unit are found without checking every resource's intervals.
+
+    :param timegrid: The result of
+        :py:meth:`webuntis.Session.timegrid_units`, or its raw data.
+
+    Units are numbered from 1, in the order of their start times.
+    """
+
+    def __init__(self, timegrid):
+        OccupancyIndex.__init__(self)
+        self._units = timegrid_units(timegrid)
+        # {(date, unit): set of occupied resources}
+        self._occupied = {}
+        # {date: set of resources known on that day}
+        self._known = {}
+
+    def units(self, date):
+        """The ``(start, end)`` times of the units on ``date``, formatted
+        like ``800``."""
+        return self._units.get(untis_day(date), [])
+
+    def update(self, resource, periods, start, end, field=None):
+        OccupancyIndex.update(self, resource, periods, start, end, field)
+        for date in days_between(format_date(start), format_date(end)):
+            self._known.setdefault(date, set()).add(resource)
+            for i, (unit_start, unit_end) in enumerate(self.units(date), 1):
+                occupied = self._occupied.setdefault((date, i), set())
+                if self._is_free(resource, time_key(date, unit_start),
+                                 time_key(date, unit_end)):
+                    occupied.discard(resource)
+                else:
+                    occupied.add(resource)
+
+    def occupied_in(self, date, unit):
+        """The resources occupied in ``unit`` on ``date``."""
+        return set(self._occupied.get((format_date(date), unit), ()))
+
+    def free_in(self, date, unit, resources=None):
+        """The resources which are free in ``unit`` on ``date``.
+
+        :param resources: Only consider these. Default to all resources known
+            on that day. Resources the index doesn't know for that day are
+            never returned.
+        """
+        date = format_date(date)
+        if not 1 <= unit <= len(self.units(date)):
+            raise ValueError('No unit %s on %s' % (unit, date))
+        known = self._known.get(date, set())
+        occupied = self._occupied.get((date, unit), set())
+        if resources is None:
+            return known - occupied
+        return set(resource for resource in resources
+                   if resource in known and resource not in occupied)
+
+    def free_units(self, resource, date):
+        """The units in which ``resource`` is free on ``date``."""
+        date = format_date(date)
+        if resource not in self._known.get(date, ()):
+            return []
+        return [unit for unit in range(1, len(self.units(date)) + 1)
+                if resource not in self._occupied.get((date, unit), ())]
+
+
+class IntervalIndex(object):
+    """A static interval tree over integer intervals, such as those made with
+    :py:func:`time_key`. Overlap and point queries take ``O(log n + k)``
+    time for ``k`` results.
+
+    The tree is implicit: the intervals are kept sorted by start, the middle
+    of every slice is the root of that slice's subtree, and each root knows
+    the latest end within its subtree.
+
+    :param intervals: An iterable of ``(start, end, value)`` tuples, ``end``
+        being exclusive. The queries return the values, ordered by start.
+    """
+
+    def __init__(self, intervals):
+        intervals = sorted(intervals, key=lambda interval: interval[:2])
+        self._starts = [start for start, end, value in intervals]
+        self._ends = [end for start, end, value in intervals]
+        self._values = [value for start, end, value in intervals]
+        self._max_ends = list(self._ends)
+        self._build(0, len(intervals))
+
+    def __len__(self):
+        return len(self._values)
+
+    def _build(self, lo, hi):
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        max_end = self._ends[mid]
+        for child in (self._build(lo, mid), self._build(mid + 1, hi)):
+            if child is not None and child > max_end:
+                max_end = child
+        self._max_ends[mid] = max_end
+        return max_end
+
+    def _search(self, lo, hi, start, end, result):
+        # all intervals in [lo, hi) with a start before ``end`` and an end
+        # after ``start``
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        if self._max_ends[mid] <= start:
+            return  # everything in this subtree ends too early
+        self._search(lo, mid, start, end, result)
+        if self._starts[mid] < end:
+            if self._ends[mid] > start:
+                result.append(self._values[mid])
+            self._search(mid + 1, hi, start, end, result)
+
+    def overlapping(self, start, end):
+        """The values of all intervals overlapping ``start`` to ``end``."""
+        result = []
+        self._search(0, len(self._values), start, end, result)
+        return result
+
+    def covering(self, point):
+        """The values of all intervals containing ``point``."""
+        return self.overlapping(point, point + 1)
+
+    def within(self, start, end):
+        """The values of all intervals lying completely between ``start`` and
+        ``end``."""
+        lo = bisect_left(self._starts, start)
+        hi = bisect_right(self._starts, end)
+        return [self._values[i] for i in range(lo, hi)
+                if self._ends[i] <= end]
@@ -10,7 +10,11 @@ _logger = None
 
 def log(level, message, *args, **kwargs):
     """Log a message to the logger used. Written inside a function so it can be
-    overridden if really necessary."""
+    overridden if really necessary.
+
+    Pass values to be formatted into the message as ``args`` (``%``-style)
+    instead of formatting them yourself, so they are only converted to
+    strings if the message actually gets logged."""
     global _logger
     if _logger is None:
         import logging
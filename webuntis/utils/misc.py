@@ -6,10 +6,17 @@
 """
 # Uncategorized utils go here
 
-from copy import deepcopy
+import hashlib
 from functools import wraps
 
-from .third_party import OrderedDict
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+from .third_party import OrderedDict, json
+from .datetime_utils import split_date_range, days_between
+from .tracing import span
 
 
 class lazyproperty(object):
@@ -32,6 +39,9 @@ class lazyproperty(object):
 
 
 class LruDict(OrderedDict):
+    #: Called with key and value of every item that gets evicted.
+    on_evict = None
+
     def __init__(self, maxlen=50):
         super(LruDict, self).__init__()
         self._maxlen = maxlen
@@ -40,18 +50,88 @@ class LruDict(OrderedDict):
         self.pop(key, None)
         super(LruDict, self).__setitem__(key, value)
         while len(self.items()) > self._maxlen:
-            self.popitem(last=False)
+            old_key, old_value = self.popitem(last=False)
+            if self.on_evict is not None:
+                self.on_evict(old_key, old_value)
 
 
 class SessionCache(LruDict):
+    #: Called with the method name (or ``None``) whenever the cache is
+    #: cleared.
+    on_clear = None
+
+    def __init__(self, maxlen=50):
+        super(SessionCache, self).__init__(maxlen=maxlen)
+        #: A :py:class:`RangeCache` for the results of date range requests.
+        self.ranges = RangeCache(maxlen=maxlen)
 
     def clear(self, method=None):
-        if method is None:
-            LruDict.clear(self)
-        else:
-            for k in list(self):
-                if k[0] == method:
-                    del self[k]
+        self.ranges.clear(method)
+        _clear_method(self, method)
+        if self.on_clear is not None:
+            self.on_clear(method)
+
+
+class RangeCache(LruDict):
+    """Caches the items of date range requests day by day, separately for
+    each element (e.g. a school class) a range was requested for. Any
+    sub-range of already fetched days can be answered from the cache, and
+    for overlapping ranges only the missing days have to be fetched.
+
+    Keys are created with :py:func:`cache_key` from the method name and the
+    request parameters without ``startDate`` and ``endDate``."""
+
+    #: JSON-RPC methods whose results are cached by day. Every item of their
+    #: results has to contain a ``date``.
+    methods = frozenset(('getTimetable', 'getSubstitutions'))
+
+    def missing(self, key, start, end):
+        """Return a list of ``(start, end)`` tuples with the ranges of days
+        between ``start`` and ``end`` that are not cached yet."""
+        cached = self[key] if key in self else {}
+        ranges = []
+        previous_missing = False
+        for day in days_between(start, end):
+            if day in cached:
+                previous_missing = False
+            elif previous_missing:
+                ranges[-1][1] = day
+            else:
+                ranges.append([day, day])
+                previous_missing = True
+        return [tuple(r) for r in ranges]
+
+    def store(self, key, start, end, data):
+        """Save the items of a result fetched for the days from ``start`` to
+        ``end``. Days without any items are cached as well."""
+        days = dict((day, []) for day in days_between(start, end))
+        for item in data:
+            items = days.get(item.get(u'date'))
+            if items is not None:
+                items.append(item)
+
+        cached = self[key] if key in self else {}
+        cached.update(days)
+        self[key] = cached
+
+    def collect(self, key, start, end):
+        """Return the cached items from ``start`` to ``end`` ordered by day.
+        All of those days have to be cached."""
+        cached = self[key]
+        return [item for day in days_between(start, end)
+                for item in cached[day]]
+
+    def clear(self, method=None):
+        _clear_method(self, method)
+
+
+def _clear_method(cache, method):
+    if method is None:
+        LruDict.clear(cache)
+    else:
+        for k in list(cache):
+            if k[0] == method:
+                del cache[k]
 
 
 class FilterDict(object):
@@ -110,6 +190,9 @@ class FilterDict(object):
         for key, value in new_pairs.items():
             self[key] = value
 
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
     def __contains__(self, key):
         return (key in self._contents and
                 self._contents[key] is not None)
@@ -145,29 +228,245 @@ def result_wrapper(func):
 
         result_class, jsonrpc_method, jsonrpc_args = func(self, **kwargs)
 
-        try:
-            key = cache_key(func.__name__, jsonrpc_args)
-        except TypeError:
-            key = cache_key(func.__name__, {"cache": str(jsonrpc_args)})
+        key = cache_key(func.__name__, jsonrpc_args)
 
         if from_cache and key in self.cache:
+            _notify(self, 'cache_hit', method=func.__name__)
             return self.cache[key]
 
-        data = self._request(jsonrpc_method, jsonrpc_args)
-        self.cache[key] = result = result_class(session=self, data=data)
-        return result
+        ranges = getattr(self.cache, 'ranges', None)
+        if ranges is not None and jsonrpc_method in ranges.methods and \
+                'startDate' in jsonrpc_args and 'endDate' in jsonrpc_args:
+            data = _request_ranges(self, func.__name__, jsonrpc_method,
+                                   jsonrpc_args, from_cache)
+            return _cache_result(self, key, result_class, data)
+
+        if from_cache:
+            _notify(self, 'cache_miss', method=func.__name__)
+
+        chunks = _date_chunks(self, jsonrpc_args)
+        if len(chunks) > 1:
+            data = _request_chunked(self, func.__name__, result_class,
+                                    jsonrpc_method, jsonrpc_args, chunks,
+                                    from_cache)
+        else:
+            data = self._request(jsonrpc_method, jsonrpc_args)
+        return _cache_result(self, key, result_class, data)
 
     return inner
 
 
+def _notify(session, event, **info):
+    notify = getattr(session, '_notify', None)
+    if notify is not None:
+        notify(event, **info)
+
+
+def _cache_result(session, key, result_class, data):
+    """Create a result object for freshly fetched data and save it in the
+    cache. If the fingerprint of the cached result for that key has been
+    used and the new data has the same fingerprint, the data didn't change
+    and the cached object is returned instead of creating a new one.
+    Fingerprints are only compared when somebody already computed the
+    cached one, hashing is much more expensive than creating a result."""
+    cached = session.cache.get(key)
+    new_fingerprint = None
+    if cached is not None and \
+            'fingerprint' in getattr(cached, '__dict__', ()):
+        new_fingerprint = fingerprint(data)
+        if cached.fingerprint == new_fingerprint:
+            session.cache[key] = cached
+            return cached
+
+    with span('webuntis.construct', result_class=result_class.__name__,
+              items=len(data) if isinstance(data, list) else 1):
+        result = result_class(session=session, data=data)
+    session.cache[key] = result
+    if new_fingerprint is not None and hasattr(result, '__dict__'):
+        # saved where the lazyproperty would put it
+        result.__dict__['fingerprint'] = new_fingerprint
+    return result
+
+
+def _date_chunks(session, jsonrpc_args):
+    """Return the chunks a request with a ``startDate`` and ``endDate``
+    should be split into, or an empty list if chunking is disabled."""
+    config = getattr(session, 'config', None)
+    if config is None or 'chunk_days' not in config:
+        return []
+    if 'startDate' not in jsonrpc_args or 'endDate' not in jsonrpc_args:
+        return []
+    return split_date_range(jsonrpc_args['startDate'],
+                            jsonrpc_args['endDate'],
+                            config['chunk_days'])
+
+
+def chunk_workers(session):
+    """The maximum number of requests ``session`` makes at the same time,
+    its ``chunk_workers`` option."""
+    return session.config.get('chunk_workers', 4)
+
+
+def _request_chunked(session, name, result_class, jsonrpc_method,
+                     jsonrpc_args, chunks, from_cache):
+    """Fetch a date range chunk by chunk and merge the chunks' data into one
+    list. Every chunk is saved in the session cache on its own, so a later
+    request for an overlapping range only fetches the chunks that are
+    missing."""
+    chunk_results = {}
+    missing = []
+    for chunk in chunks:
+        key = cache_key(name, _chunk_args(jsonrpc_args, chunk))
+        if from_cache and key in session.cache:
+            chunk_results[chunk] = session.cache[key]
+        else:
+            missing.append(chunk)
+
+    fetched = parallel_map(
+        lambda chunk: session._request(jsonrpc_method,
+                                       _chunk_args(jsonrpc_args, chunk)),
+        missing, chunk_workers(session))
+
+    # the cache is only written from this thread
+    for chunk, data in zip(missing, fetched):
+        key = cache_key(name, _chunk_args(jsonrpc_args, chunk))
+        session.cache[key] = chunk_results[chunk] = \
+            result_class(session=session, data=data)
+
+    return [getattr(item, '_data', item)
+            for chunk in chunks
+            for item in chunk_results[chunk]._data]
+
+
+def _request_ranges(session, name, jsonrpc_method, jsonrpc_args, from_cache):
+    """Fetch a date range through the session's :py:class:`RangeCache`. If
+    ``from_cache`` is set, only days which are not cached yet are fetched,
+    otherwise the whole range is fetched again."""
+    ranges = session.cache.ranges
+    start, end = jsonrpc_args['startDate'], jsonrpc_args['endDate']
+    element = _range_key(name, jsonrpc_args)
+
+    if from_cache:
+        missing = ranges.missing(element, start, end)
+        _notify(session, 'cache_miss' if missing else 'cache_hit',
+                method=name)
+    else:
+        missing = [(start, end)]
+
+    requests = []
+    for missing_range in missing:
+        range_args = _chunk_args(jsonrpc_args, missing_range)
+        requests.extend(_date_chunks(session, range_args) or [missing_range])
+
+    fetched = parallel_map(
+        lambda chunk: session._request(jsonrpc_method,
+                                       _chunk_args(jsonrpc_args, chunk)),
+        requests, chunk_workers(session))
+
+    for chunk, data in zip(requests, fetched):
+        ranges.store(element, chunk[0], chunk[1], data)
+
+    if requests == [(start, end)]:
+        # keep the order the server returned
+        return fetched[0]
+    return ranges.collect(element, start, end)
+
+
+def fetch_ranges(session, name, jsonrpc_method, requests, from_cache):
+    """Fetch the data of several date range requests, given as lists of
+    JSON-RPC parameters, without saving anything in the session cache, so
+    fetching many elements doesn't evict what the user cached. If
+    ``from_cache`` is set, requests whose days are all in the session's
+    :py:class:`RangeCache` are answered from it. Returns a list with the data
+    of each request."""
+    ranges = session.cache.ranges
+    results = []
+    chunks = []
+    for i, jsonrpc_args in enumerate(requests):
+        start, end = jsonrpc_args['startDate'], jsonrpc_args['endDate']
+        element = _range_key(name, jsonrpc_args)
+        if from_cache and not ranges.missing(element, start, end):
+            results.append(ranges.collect(element, start, end))
+            continue
+        results.append([])
+        chunks.extend((i, chunk) for chunk in
+                      _date_chunks(session, jsonrpc_args) or [(start, end)])
+
+    fetched = parallel_map(
+        lambda chunk: session._request(
+            jsonrpc_method, _chunk_args(requests[chunk[0]], chunk[1])),
+        chunks, chunk_workers(session))
+
+    for (i, chunk), data in zip(chunks, fetched):
+        results[i].extend(data)
+    return results
+
+
+def _range_key(name, jsonrpc_args):
+    return cache_key(name, dict(
+        (k, v) for k, v in jsonrpc_args.items()
+        if k not in ('startDate', 'endDate')
+    ))
+
+
+def _chunk_args(jsonrpc_args, chunk):
+    return dict(jsonrpc_args, startDate=chunk[0], endDate=chunk[1])
+
+
+def parallel_map(func, items, workers=4):
+    """Like ``map``, but calls ``func`` from a pool of up to ``workers``
+    threads. The results are returned as a list, in order. Exceptions are
+    propagated to the caller."""
+    items = list(items)
+    if workers < 2 or len(items) < 2:
+        return [func(item) for item in items]
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as pool:
+        return list(pool.map(func, items))
+
+
 result_wrapper.session_use_cache = False
 '''use cache - global'''
 
 
-def cache_key(method, args=None):
-    """Get a hashable object given a string and a dictionary."""
-    if args is None:
-        args = {}
-    hash_args = frozenset(deepcopy(args).items())
+def fingerprint(data):
+    """A stable hash of JSON data: the SHA-1 digest of its canonical JSON
+    representation. Equal data always has the same fingerprint, regardless
+    of the order of dictionary keys. Other mappings are hashed like
+    dictionaries."""
+    return hashlib.sha1(json.dumps(
+        data, sort_keys=True, separators=(',', ':'), default=_mapping
+    ).encode('utf-8')).digest()
+
 
-    return method, hash_args
+def _mapping(value):
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError('%r is not JSON serializable' % (value,))
+
+
+_no_args = frozenset()
+
+
+def cache_key(method, args=None):
+    """Get a hashable object given a string and a dictionary. Nested
+    dictionaries and lists are converted to frozensets and tuples, the
+    arguments themselves are neither copied nor modified."""
+    if not args:
+        return method, _no_args
+    try:
+        return method, frozenset(args.items())
+    except TypeError:
+        return method, _freeze(args)
+
+
+def _freeze(value):
+    """Recursively convert a JSON-like value to a hashable one."""
+    if isinstance(value, dict):
+        return frozenset((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    return value
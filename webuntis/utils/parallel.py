@@ -0,0 +1,154 @@
+"""
+    This file is part of python-webuntis
+
+    :copyright: (c) 2013 by Markus Unterwaditzer.
+    :license: BSD, see LICENSE for more details.
+"""
+import os
+
+from .serialization import class_name
+
+
+class _OfflineSession(object):
+    """The session of the results rebuilt in a worker process. The
+    operations must not need any data from the API."""
+
+
+def _rebuild(payload):
+    from webuntis import objects
+    class_name, data = payload
+    return getattr(objects, class_name)(data=data, session=_OfflineSession())
+
+
+def _payload(periods):
+    # lists of other modules, such as those of webuntis.periodstore, are
+    # rebuilt as their base class of webuntis.objects
+    return class_name(periods), [dict(data) for data in periods.iter_raw()]
+
+
+def _positions(periods):
+    return dict((id(period), i) for i, period in enumerate(periods))
+
+
+def _combine(periods, **kwargs):
+    return list(periods.combine(**kwargs).iter_raw())
+
+
+def _rebind_combine(periods, data):
+    return type(periods)(parent=periods, data=data)
+
+
+def _to_table(periods, **kwargs):
+    positions = _positions(periods)
+    return [(time, [(date, [positions[id(period)] for period in cell])
+                    for date, cell in row])
+            for time, row in periods.to_table(**kwargs)]
+
+
+def _rebind_to_table(periods, table):
+    return [(time, [(date, set(periods[i] for i in cell))
+                    for date, cell in row])
+            for time, row in table]
+
+
+def _diff(pair, **kwargs):
+    old, new = pair
+    old_positions, new_positions = _positions(old), _positions(new)
+    d = old.diff(new)
+    return ([new_positions[id(period)] for period in d.added],
+            [old_positions[id(period)] for period in d.removed],
+            [(old_positions[id(o)], new_positions[id(n)], fields)
+             for o, n, fields in d.changed])
+
+
+def _rebind_diff(pair, result):
+    from .timetable_utils import TimetableDiff
+    old, new = pair
+    added, removed, changed = result
+    return TimetableDiff([new[i] for i in added],
+                         [old[i] for i in removed],
+                         [(old[o], new[n], fields) for o, n, fields in changed])
+
+
+#: {name: (function run in the worker, function rebinding its result)}
+_operations = {
+    'combine': (_combine, _rebind_combine),
+    'to_table': (_to_table, _rebind_to_table),
+    'diff': (_diff, _rebind_diff),
+}
+
+
+def _work(task):
+    operation, kwargs, payloads = task
+    if operation in _operations:
+        operation = _operations[operation][0]
+    results = []
+    for payload in payloads:
+        if isinstance(payload, list):  # several lists, e.g. for diff
+            item = tuple(_rebuild(p) for p in payload)
+        else:
+            item = _rebuild(payload)
+        results.append(operation(item, **kwargs))
+    return results
+
+
+def process_map(operation, items, workers=None, chunksize=None, **kwargs):
+    """Run an operation on many period lists in a pool of processes, which
+    unlike threads can use several CPU cores at once::
+
+        timetables = [s.timetable(klasse=k, ...) for k in s.klassen()]
+        tables = process_map('to_table', timetables)
+
+    Only the raw data of the lists is sent to the worker processes. The
+    results are sent back in a compact form and bound to the given lists
+    again, so they consist of the same item objects as if the operation ran
+    in this process.
+
+    :param operation: One of
+
+        - ``'combine'`` -- :py:meth:`webuntis.objects.PeriodList.combine`,
+          returns the combined lists with the given ones as parents.
+        - ``'to_table'`` -- :py:meth:`webuntis.objects.PeriodList.to_table`.
+        - ``'diff'`` -- :py:meth:`webuntis.objects.PeriodList.diff`, the items
+          being ``(old, new)`` pairs of lists.
+
+        Or a function taking a list and returning anything that can be
+        pickled, which is returned as it is. It must be defined on module
+        level and must not need the session.
+
+    :param items: The period lists.
+    :param workers: The number of processes. Default to the number of CPUs.
+    :param chunksize: The number of lists sent to a process at once. By
+        default, every process gets about four chunks, so there are few but
+        still evenly distributed messages.
+    :param kwargs: Passed on to the operation.
+
+    :returns: A list with the result for every item.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    items = list(items)
+    if not items:
+        return []
+
+    payloads = [[_payload(periods) for periods in item]
+                if isinstance(item, tuple) else _payload(item)
+                for item in items]
+
+    workers = workers or os.cpu_count() or 1
+    if workers < 2 or len(items) < 2:
+        # not worth starting processes
+        results = _work((operation, kwargs, payloads))
+    else:
+        if chunksize is None:
+            chunksize = max(1, len(items) // (workers * 4))
+        tasks = [(operation, kwargs, payloads[i:i + chunksize])
+                 for i in range(0, len(payloads), chunksize)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = [result for chunk in pool.map(_work, tasks)
+                       for result in chunk]
+
+    if operation in _operations:
+        rebind = _operations[operation][1]
+        return [rebind(item, result) for item, result in zip(items, results)]
+    return results
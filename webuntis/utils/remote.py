@@ -6,11 +6,13 @@
 """
 from webuntis import errors
 from webuntis.utils import log
+from webuntis.utils.tracing import span
 from webuntis.utils.userinput import unicode_string, bytestring
 from webuntis.utils.third_party import json
 
 import datetime
-import requests
+import threading
+import time
 
 _errorcodes = {
     -32601: errors.MethodNotFoundError,
@@ -22,13 +24,16 @@ _errorcodes = {
 '''The API-errorcodes python-webuntis is able to interpret, together with the
 exception that will be thrown.'''
 
+_transfer = threading.local()
+
 
 def rpc_request(config, method, params):
     """
     A method for sending a JSON-RPC request.
 
     :param config: A dictionary containing ``useragent``, ``server``,
-        ``school``, ``username`` and ``password``
+        ``school``, ``username`` and ``password``, and optionally a
+        ``transport`` to use instead of :py:func:`_send_request`
     :type config: dict or FilterDict
 
     :param method: The JSON-RPC method to be executed
@@ -73,16 +78,18 @@ def rpc_request(config, method, params):
                 'Don\'t have JSESSIONID. Did you already log out?')
 
     log('debug', 'Making new request:')
-    log('debug', 'URL: ' + url)
+    log('debug', 'URL: %s', url)
     if method != u'authenticate':
         # user credentials will not be logged - fixing #14
-        log('debug', 'DATA: ' + str(request_body))
+        log('debug', 'DATA: %s', request_body)
 
     if '_http_session' not in config:
-        config['_http_session'] = requests.session()
+        config['_http_session'] = _new_http_session()
     http_session = config['_http_session']
 
-    result_body = _send_request(
+    transport = config['transport'] if 'transport' in config \
+        else _send_request
+    result_body = transport(
         url,
         request_body,
         headers,
@@ -143,23 +150,64 @@ def _parse_error_code(request_body, result_body):
     raise exc
 
 
+def _new_http_session():
+    # requests takes long to import, so it is imported when the first request
+    # is made, not when python-webuntis is imported
+    import requests
+    return requests.session()
+
+
 def _send_request(url, data, headers, http_session=None):
     """Sends a POST request given the endpoint URL, JSON-encodable data,
     a dictionary with headers and, optionally, a session object for requests.
     """
 
     if http_session is None:
-        http_session = requests.session()
-
-    r = http_session.post(url, data=json.dumps(data), headers=headers)
+        http_session = _new_http_session()
+
+    start = time.time()
+    with span('webuntis.http', method=data[u'method']) as http_span:
+        r = http_session.post(url, data=json.dumps(data), headers=headers)
+        http_span.set_attribute('status', r.status_code)
+        http_span.set_attribute('bytes', len(r.content))
+    duration = time.time() - start
     result = r.text
     # this will eventually raise errors, e.g. on timeout
 
+    # one record per request, the details are also available as attributes
+    # of the log record
+    log('debug', 'Request %s: status %s, %d bytes, %.3fs',
+        data[u'method'], r.status_code, len(r.content), duration,
+        extra={
+            'rpc_method': data[u'method'],
+            'rpc_status': r.status_code,
+            'rpc_bytes': len(r.content),
+            'rpc_duration': duration
+        })
+
+    decode_start = time.time()
     try:
-        result_data = json.loads(result, )
+        with span('webuntis.json_decode', bytes=len(r.content)):
+            result_data = json.loads(result, )
         log('debug', 'Valid JSON found')
-        log('debug', '  Got data' + str(result)[:100])
+        log('debug', '  Got data %.100s', result)
     except ValueError:
         raise errors.RemoteError('Invalid JSON', result)
     else:
         return result_data
+    finally:
+        _transfer.stats = {
+            'status': r.status_code,
+            'bytes': len(r.content),
+            'duration': duration,
+            'decode_time': time.time() - decode_start
+        }
+
+
+def pop_transfer_stats():
+    """Return and forget the statistics about the last HTTP request
+    :py:func:`_send_request` made in the current thread: a dictionary with
+    ``status``, ``bytes``, ``duration`` and ``decode_time``, or ``None``."""
+    stats = getattr(_transfer, 'stats', None)
+    _transfer.stats = None
+    return stats
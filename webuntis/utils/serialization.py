@@ -0,0 +1,218 @@
+"""
+    This file is part of python-webuntis
+
+    :copyright: (c) 2013 by Markus Unterwaditzer.
+    :license: BSD, see LICENSE for more details.
+
+A compact binary format for results, e.g. to send timetables to other
+processes or to store them on disk::
+
+    blob = serialization.dumps(s.timetable(...))
+    timetable = serialization.loads(blob, session=s)
+
+Results are saved without their session, :py:func:`loads` binds them to the
+given one. Every distinct string is stored once, dictionaries are stored as
+lists of values referring to a shared list of their keys, dates are stored
+as day numbers and everything is compressed. If `msgpack
+<https://pypi.org/project/msgpack/>`_ is installed it is used for encoding,
+otherwise JSON.
+"""
+import datetime
+import zlib
+
+from .third_party import json, import_msgpack
+
+#: The msgpack module or ``None``, imported when first needed.
+msgpack = _not_imported = object()
+
+_format_version = 1
+
+# how a value in a dictionary is stored
+_raw = 0
+_string = 1
+_date = 2
+
+# markers of encoded lists and strings outside of dictionaries, dictionaries
+# start with the (non-negative) index of their shape
+_list = -1
+_list_string = -2
+
+_date_keys = frozenset((u'date', u'startDate', u'endDate'))
+_min_date, _max_date = 10000101, 99991231
+
+
+def _ordinal(date):
+    """The day number of a date formatted like ``20120303``, or ``None`` if
+    there is no such day."""
+    try:
+        return datetime.date(date // 10000, date // 100 % 100,
+                             date % 100).toordinal()
+    except ValueError:
+        return None
+
+
+class _Encoder(object):
+    def __init__(self):
+        self.strings = []
+        self.shapes = []
+        self._string_ids = {}
+        self._shape_ids = {}
+
+    def string(self, value):
+        try:
+            return self._string_ids[value]
+        except KeyError:
+            i = self._string_ids[value] = len(self.strings)
+            self.strings.append(value)
+            return i
+
+    def shape(self, shape):
+        try:
+            return self._shape_ids[shape]
+        except KeyError:
+            i = self._shape_ids[shape] = len(self.shapes)
+            self.shapes.append(shape)
+            return i
+
+    def encode(self, value):
+        if isinstance(value, dict):
+            keys = []
+            kinds = []
+            values = []
+            for key, item in value.items():
+                keys.append(self.string(key))
+                if isinstance(item, type(u'')):
+                    kinds.append(_string)
+                    values.append(self.string(item))
+                    continue
+                ordinal = None
+                if key in _date_keys and type(item) is int and \
+                        _min_date <= item <= _max_date:
+                    ordinal = _ordinal(item)
+                if ordinal is not None:
+                    kinds.append(_date)
+                    values.append(ordinal)
+                else:
+                    kinds.append(_raw)
+                    values.append(self.encode(item))
+            return [self.shape(tuple(keys + kinds))] + values
+        elif isinstance(value, (list, tuple)):
+            return [_list] + [self.encode(item) for item in value]
+        elif isinstance(value, type(u'')):
+            return [_list_string, self.string(value)]
+        return value
+
+
+class _Decoder(object):
+    def __init__(self, strings, shapes):
+        self.strings = strings
+        # for every shape: the keys, and the positions of the values stored
+        # as strings, as dates and as anything else
+        self.shapes = []
+        for shape in shapes:
+            half = len(shape) // 2
+            kinds = shape[half:]
+            self.shapes.append((
+                [strings[key] for key in shape[:half]],
+                [i for i, kind in enumerate(kinds) if kind == _string],
+                [i for i, kind in enumerate(kinds) if kind == _date],
+                [i for i, kind in enumerate(kinds) if kind == _raw],
+            ))
+        self._dates = {}
+
+    def date(self, ordinal):
+        try:
+            return self._dates[ordinal]
+        except KeyError:
+            d = datetime.date.fromordinal(ordinal)
+            value = self._dates[ordinal] = \
+                d.year * 10000 + d.month * 100 + d.day
+            return value
+
+    def decode(self, value):
+        if type(value) is not list:
+            return value
+        marker = value[0]
+        if marker == _list:
+            decode = self.decode
+            return [decode(item) for item in value[1:]]
+        elif marker == _list_string:
+            return self.strings[value[1]]
+
+        keys, string_positions, date_positions, raw_positions = \
+            self.shapes[marker]
+        values = value[1:]
+        strings = self.strings
+        for i in string_positions:
+            values[i] = strings[values[i]]
+        for i in date_positions:
+            values[i] = self.date(values[i])
+        for i in raw_positions:
+            if type(values[i]) is list:
+                values[i] = self.decode(values[i])
+        return dict(zip(keys, values))
+
+
+def _raw_data(result):
+    if hasattr(result, 'iter_raw'):
+        return list(result.iter_raw())
+    return result._data
+
+
+def _msgpack():
+    global msgpack
+    if msgpack is _not_imported:
+        msgpack = import_msgpack()
+    return msgpack
+
+
+def class_name(result):
+    """The name of the first class of :py:mod:`webuntis.objects` ``result``
+    is an instance of, e.g. ``PeriodList`` for the lists of
+    :py:mod:`webuntis.periodstore`."""
+    from webuntis import objects
+    for cls in type(result).__mro__:
+        if getattr(objects, cls.__name__, None) is cls:
+            return cls.__name__
+    raise TypeError('Not a result: %r' % (result,))
+
+
+def dumps(result):
+    """Serialize a :py:class:`webuntis.objects.Result` to bytes."""
+    encoder = _Encoder()
+    data = encoder.encode(_raw_data(result))
+    document = [_format_version, class_name(result), encoder.strings,
+                [list(shape) for shape in encoder.shapes], data]
+
+    msgpack = _msgpack()
+    if msgpack is not None:
+        return b'M' + zlib.compress(msgpack.packb(document, use_bin_type=True))
+    return b'J' + zlib.compress(
+        json.dumps(document, separators=(',', ':')).encode('utf-8'))
+
+
+def loads(blob, session):
+    """Load a result serialized with :py:func:`dumps`, bound to
+    ``session``."""
+    from webuntis import objects
+
+    kind, body = blob[:1], zlib.decompress(blob[1:])
+    if kind == b'M':
+        msgpack = _msgpack()
+        if msgpack is None:
+            raise ValueError('msgpack is required to load this result.')
+        document = msgpack.unpackb(body, raw=False)
+    elif kind == b'J':
+        document = json.loads(body.decode('utf-8'))
+    else:
+        raise ValueError('Not a serialized result.')
+
+    version, name, strings, shapes, data = document
+    if version != _format_version:
+        raise ValueError('Unsupported format version: %r' % version)
+    result_class = getattr(objects, name, None)
+    if not (isinstance(result_class, type) and
+            issubclass(result_class, objects.Result)):
+        raise ValueError('Unknown result class: %r' % name)
+    data = _Decoder(strings, shapes).decode(data)
+    return result_class(data=data, session=session)
@@ -14,3 +14,14 @@ try:
 except ImportError:
     # Python 2
     import urlparse
+
+
+def import_msgpack():
+    """Import the optional msgpack module used by
+    webuntis.utils.serialization when it is needed. Returns ``None`` if it is
+    not installed."""
+    try:
+        import msgpack
+    except ImportError:
+        return None
+    return msgpack
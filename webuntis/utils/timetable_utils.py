@@ -7,15 +7,32 @@
 
 from __future__ import unicode_literals
 
+from bisect import bisect_right
 from copy import deepcopy
 from datetime import datetime
 
+from .datetime_utils import parse_date, parse_time
+from .intervals import iter_raw, time_key, timegrid_units, untis_day
+from .misc import fingerprint
+from .tracing import span
 
-def table(periods, dates=None, times=None):
+
+def table(periods, dates=None, times=None, timegrid=None):
     """The backend of :py:meth:`webuntis.objects.PeriodList.to_table`."""
 
+    if not hasattr(periods, '__getitem__'):
+        periods = list(periods)
+    with span('webuntis.table', items=len(periods)):
+        if timegrid is not None:
+            return _timegrid_table(periods, dates, timegrid)
+        return _table(periods, dates, times)
+
+
+def _table(periods, dates, times):
     if not len(periods):
         return []
+    if hasattr(periods, 'interval_index'):
+        return _indexed_table(periods, dates, times)
 
     # generate some useful sets
     times = set(times or []).union(period.start.time() for period in periods)
@@ -37,6 +54,86 @@ def table(periods, dates=None, times=None):
     return sorted((time, sorted(row.items())) for time, row in ttable.items())
 
 
+def _indexed_table(periods, dates, times):
+    # Same as above for a PeriodList, but only the distinct dates and times
+    # get parsed, and each cell is a lookup in the list's interval index.
+    raw = list(periods.iter_raw())
+    times = set(times or []).union(
+        parse_time(t).time() for t in set(data[u'startTime'] for data in raw))
+    dates = set(dates or []).union(
+        parse_date(d).date() for d in set(data[u'date'] for data in raw))
+
+    index = periods.interval_index
+    ttable = {}
+    for t in times:
+        row = ttable[t] = {}
+        for d in dates:
+            key = time_key(d.year * 10000 + d.month * 100 + d.day,
+                           t.hour * 100 + t.minute)
+            row[d] = set(periods[i] for i in index.covering(key))
+
+    return sorted((time, sorted(row.items())) for time, row in ttable.items())
+
+
+def slot_index(periods, timegrid):
+    """Map the units of a timegrid to the periods taking place in them.
+
+    :param periods: A :py:class:`webuntis.objects.PeriodList`, or any
+        iterable of periods or their raw data.
+    :param timegrid: The result of
+        :py:meth:`webuntis.Session.timegrid_units`, or its raw data.
+
+    :returns: A dictionary ``{(date, unit): [position, ...]}`` with dates
+        formatted like ``20120303``, units numbered from 1 and the positions
+        of the periods in ``periods``. A period is in every unit it overlaps
+        with, so double lessons are in two units.
+    """
+    units = timegrid_units(timegrid)
+    days = {}
+    index = {}
+    for i, data in enumerate(iter_raw(periods)):
+        date = int(data[u'date'])
+        try:
+            starts, ends = days[date]
+        except KeyError:
+            day_units = units.get(untis_day(date), [])
+            starts, ends = days[date] = ([s for s, e in day_units],
+                                         [e for s, e in day_units])
+
+        start, end = int(data[u'startTime']), int(data[u'endTime'])
+        # the first unit which ends after the start of the period
+        unit = bisect_right(ends, start)
+        while unit < len(starts) and starts[unit] < end:
+            index.setdefault((date, unit + 1), []).append(i)
+            unit += 1
+    return index
+
+
+def _timegrid_table(periods, dates, timegrid):
+    units = timegrid_units(timegrid)
+    index = slot_index(periods, timegrid)
+    dates = set(dates or []).union(
+        parse_date(d).date() for d in set(data[u'date']
+                                          for data in iter_raw(periods)))
+
+    # {start time: {date: unit}} of all units on these dates
+    rows = {}
+    for d in dates:
+        for unit, (start, end) in enumerate(units.get(untis_day(d), []), 1):
+            rows.setdefault(start, {})[d] = unit
+
+    ttable = []
+    for start, row in sorted(rows.items()):
+        cells = []
+        for d in sorted(dates):
+            date = d.year * 10000 + d.month * 100 + d.day
+            unit = row.get(d)
+            cells.append((d, set(periods[i]
+                                 for i in index.get((date, unit), ()))))
+        ttable.append((parse_time(start).time(), cells))
+    return ttable
+
+
 def combine(periods, fields, combine_breaks, sort_before=None):
     """
     shorten a list of periods (or substitutions) by combining consecutive Elements
@@ -54,9 +151,14 @@ def combine(periods, fields, combine_breaks, sort_before=None):
     if len(periods) < 2:
         return periods
 
+    with span('webuntis.combine', items=len(periods)):
+        return _combine(periods, fields, combine_breaks, sort_before)
+
+
+def _combine(periods, fields, combine_breaks, sort_before):
     result_type = type(periods)
 
-    olddata = [deepcopy(p._data) for p in periods]
+    olddata = [deepcopy(data) for data in periods.iter_raw()]
 
     # lambda p: (p[u'te'][0][u'name'], p[u'date'], p[u'startTime'])
 
@@ -98,5 +200,142 @@ def combine(periods, fields, combine_breaks, sort_before=None):
     data.append(last)
 
     data.sort(key=lambda p: (p[u'date'], p[u'startTime']))
-    res = result_type(parent=periods._parent, session=periods._session, data=data)
-    return res
+    if periods._parent is not None:
+        # results may not get both a parent and a session
+        return result_type(parent=periods._parent, data=data)
+    return result_type(session=periods._session, data=data)
+
+
+class TimetableDiff(object):
+    """The changes between two timetables, as returned by
+    :py:meth:`webuntis.objects.PeriodList.diff`. A diff is true if anything
+    changed."""
+
+    def __init__(self, added, removed, changed):
+        #: Periods of the new timetable which weren't in the old one.
+        self.added = added
+        #: Periods of the old timetable which aren't in the new one anymore.
+        self.removed = removed
+        #: A list of ``(old_period, new_period, fields)`` tuples, ``fields``
+        #: being a set with the names of the raw fields that changed, such as
+        #: ``code``, ``ro`` or ``te``.
+        self.changed = changed
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    __nonzero__ = __bool__
+
+    def __repr__(self):
+        return '%s(added=%d, removed=%d, changed=%d)' % (
+            self.__class__.__name__,
+            len(self.added), len(self.removed), len(self.changed))
+
+
+def diff(old, new):
+    """The backend of :py:meth:`webuntis.objects.PeriodList.diff`.
+
+    Periods are matched by their ID. Only periods whose fingerprints differ
+    are compared field by field."""
+
+    if old is new:
+        return TimetableDiff([], [], [])
+
+    def index(periods):
+        return dict((period.id, (fingerprint(period._data), period))
+                    for period in periods)
+
+    old_index = index(old)
+    new_index = index(new)
+
+    added = [period for id, (fp, period) in new_index.items()
+             if id not in old_index]
+    removed = [period for id, (fp, period) in old_index.items()
+               if id not in new_index]
+
+    changed = []
+    for id, (new_fp, new_period) in new_index.items():
+        try:
+            old_fp, old_period = old_index[id]
+        except KeyError:
+            continue
+        if old_fp == new_fp:
+            continue
+        old_data, new_data = old_period._data, new_period._data
+        fields = set(
+            field for field in set(old_data) | set(new_data)
+            if old_data.get(field) != new_data.get(field)
+        )
+        changed.append((old_period, new_period, fields))
+
+    return TimetableDiff(added, removed, changed)
+
+
+class Collision(object):
+    """Periods that occupy the same resource at overlapping times, as
+    returned by :py:meth:`webuntis.objects.PeriodList.collisions`."""
+
+    def __init__(self, field, resource, periods):
+        #: The field of the periods the resource is listed in, e.g. ``ro``.
+        self.field = field
+        #: The ID of the resource.
+        self.resource = resource
+        #: The colliding :py:class:`webuntis.objects.PeriodObject` instances,
+        #: sorted by their start. Each one overlaps with at least one other.
+        self.periods = periods
+
+    def __repr__(self):
+        return '%s(field=%r, resource=%r, periods=%r)' % (
+            self.__class__.__name__, self.field, self.resource,
+            [period.id for period in self.periods])
+
+
+def collisions(periodlists, fields=(u'ro', u'te', u'kl')):
+    """The backend of :py:meth:`webuntis.objects.PeriodList.collisions`.
+
+    :param periodlists: A :py:class:`webuntis.objects.PeriodList` or an
+        iterable of them. A period contained in several lists, e.g. in the
+        timetable of a class and in that of its room, is only looked at once.
+    """
+    if hasattr(periodlists, 'iter_raw'):
+        periodlists = [periodlists]
+
+    # {(field, resource): [(start, end, list, index)]}, without looking at
+    # the same period twice
+    bookings = {}
+    seen = set()
+    for periods in periodlists:
+        for i, data in enumerate(periods.iter_raw()):
+            if data.get(u'code') == u'cancelled':
+                continue
+            if u'id' in data:
+                if data[u'id'] in seen:
+                    continue
+                seen.add(data[u'id'])
+            start = time_key(data[u'date'], data[u'startTime'])
+            end = time_key(data[u'date'], data[u'endTime'])
+            for field in fields:
+                for element in data.get(field, ()):
+                    bookings.setdefault((field, element[u'id']), []).append(
+                        (start, end, periods, i))
+
+    result = []
+    for (field, resource), booked in sorted(bookings.items()):
+        # sweep: a period collides with the group before it if it starts
+        # before the latest end in that group
+        booked.sort(key=lambda booking: booking[:2])
+        group = [booked[0]]
+        group_end = booked[0][1]
+        for booking in booked[1:] + [None]:
+            if booking is not None and booking[0] < group_end:
+                group.append(booking)
+                group_end = max(group_end, booking[1])
+                continue
+            if len(group) > 1:
+                result.append(Collision(field, resource, [
+                    periods[i] for start, end, periods, i in group]))
+            if booking is not None:
+                group = [booking]
+                group_end = booking[1]
+
+    return result
@@ -0,0 +1,62 @@
+"""
+    This file is part of python-webuntis
+
+    :copyright: (c) 2013 by Markus Unterwaditzer.
+    :license: BSD, see LICENSE for more details.
+
+Optional tracing spans around the session, the transport, JSON decoding,
+object construction and the timetable utilities. Tracing is disabled by
+default and costs next to nothing then. To enable it, pass an
+`OpenTelemetry <https://opentelemetry.io/>`_ tracer (or anything else with a
+compatible ``start_as_current_span`` method)::
+
+    from opentelemetry import trace
+    import webuntis.utils.tracing
+
+    webuntis.utils.tracing.set_tracer(trace.get_tracer('webuntis'))
+
+The following spans are created:
+
+- ``webuntis.request`` -- :py:meth:`webuntis.Session._request`, with the
+  JSON-RPC ``method``.
+- ``webuntis.http`` -- sending the HTTP request, with the ``method``, the
+  HTTP ``status`` and the response size in ``bytes``.
+- ``webuntis.json_decode`` -- decoding the response, with its ``bytes``.
+- ``webuntis.construct`` -- creating the result object, with the
+  ``result_class`` and the number of ``items``.
+- ``webuntis.table`` and ``webuntis.combine`` -- the backends of
+  :py:meth:`webuntis.objects.PeriodList.to_table` and ``combine``, with the
+  number of ``items``.
+"""
+
+_tracer = None
+
+
+def set_tracer(tracer):
+    """Enable tracing with the given tracer, or disable it with ``None``."""
+    global _tracer
+    _tracer = tracer
+
+
+def span(name, **attributes):
+    """Return a context manager for a span with the given name and
+    attributes. The object it returns supports ``set_attribute``."""
+    if _tracer is None:
+        return _null_span
+    return _tracer.start_as_current_span(name, attributes=attributes)
+
+
+class _NullSpan(object):
+    """Used when tracing is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def set_attribute(self, key, value):
+        pass
+
+
+_null_span = _NullSpan()
@@ -46,6 +46,14 @@ def string(value):
     return value.decode('ascii')
 
 
+def positive_int(value):
+    """Make the value an integer of at least 1"""
+    value = int(value)
+    if value < 1:
+        raise ValueError('Must be at least 1: %r' % value)
+    return value
+
+
 config_keys = {
     'username': string,
     'password': string,
@@ -54,6 +62,9 @@ config_keys = {
     'server': server,
     'useragent': string,
     'login_repeat': int,
+    'chunk_days': positive_int,
+    'chunk_workers': positive_int,
+    'transport': None,
     '_http_session': None
 }
 